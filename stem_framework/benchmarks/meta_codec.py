@@ -0,0 +1,48 @@
+"""
+Benchmark of Envelope meta codecs on metas of unit and distributor traffic.
+
+    python -m benchmarks.meta_codec
+"""
+import sys
+import timeit
+from typing import Optional
+
+from stem.meta_codec import JSON, BINARY, get_codec
+
+METAS = {
+    "command": {"command": "powerfullity"},
+    "run": {"command": "run", "task_path": "int_workspace.sub.int_reduce",
+            "int_range": {"start": 0, "stop": 1000, "step": 3}, "data_scale": {"factor": 2.5}},
+    "reply": {"status": "success", "task_result": list(range(64))},
+    "structure": {"status": "success", "name": "IntWorkspace",
+                  "tasks": {f"task_{i}": {"dependencies": [f"task_{j}" for j in range(i)]} for i in range(16)}},
+}
+
+
+def measure(number: int = 10000) -> dict[str, dict[str, float]]:
+    """
+    Return size in bytes and encode and decode time in microseconds of every meta by every codec
+    """
+    results = {}
+    for name, meta in METAS.items():
+        for meta_type in (JSON, BINARY):
+            codec = get_codec(meta_type)
+            encoded = codec.encode(meta)
+            view = memoryview(encoded)
+            results[f"{name}/{meta_type.decode()}"] = {
+                "size": len(encoded),
+                "encode": timeit.timeit(lambda: codec.encode(meta), number=number) / number * 1e6,
+                "decode": timeit.timeit(lambda: codec.decode(view), number=number) / number * 1e6,
+            }
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    number = int(argv[0]) if argv else 10000
+    for key, result in measure(number).items():
+        print("{:<16} size {size:6d} B  encode {encode:8.2f} us  decode {decode:8.2f} us".format(key, **result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,110 @@
+"""
+Benchmark of runners over synthetic workspaces.
+
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --compare baseline.json
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Optional
+
+from stem.memory import MemoryMonitor
+from stem.task_master import TaskMaster
+from stem.task_runner import TaskRunner, SimpleRunner, ThreadingRunner, AsyncRunner, ProcessingRunner, \
+    StreamingRunner
+from stem.workspace import IWorkspace
+from benchmarks.synthetic import WORKSPACES, task_count
+
+RUNNERS = [SimpleRunner, ThreadingRunner, AsyncRunner, ProcessingRunner, StreamingRunner]
+TOLERANCE = 0.25
+PARENT_MEMORY_ONLY = (ProcessingRunner,)
+
+
+def measure(runner: TaskRunner, workspace: IWorkspace, repeat: int) -> dict[str, float]:
+    """
+    Run root task of workspace repeat times and return best latency, throughput in tasks per second
+    and peak of memory in bytes. Memory is traced in a separate run, so tracing does not slow down timed runs
+    """
+    task = workspace.find_task("root")
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        TaskMaster(runner).execute({}, task, workspace).data
+        latencies.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        TaskMaster(runner).execute({}, task, workspace).data
+        _, allocated = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    latency = min(latencies)
+    return {
+        "latency": latency,
+        "throughput": task_count(workspace) / latency,
+        "memory": max(allocated, runner.memory.peak),
+    }
+
+
+def run(repeat: int, names: Optional[list[str]] = None) -> dict[str, dict[str, float]]:
+    results = {}
+    for workspace in WORKSPACES:
+        if names and workspace.name not in names:
+            continue
+        for runner_type in RUNNERS:
+            key = f"{workspace.name}/{runner_type.__name__}"
+            results[key] = measure(runner_type(memory=MemoryMonitor()), workspace, repeat)
+            mark = "*" if runner_type in PARENT_MEMORY_ONLY else " "
+            print("{:<32} latency {latency:8.4f} s  throughput {throughput:10.1f} tasks/s  memory {memory:12,d} B{}"
+                  .format(key, mark, **results[key]))
+    if any(runner_type in PARENT_MEMORY_ONLY for runner_type in RUNNERS):
+        print("* memory of parent process only, memory of worker processes is not counted")
+    return results
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+            tolerance: float = TOLERANCE) -> list[str]:
+    """
+    Return descriptions of results which latency or memory is worse than baseline by more than tolerance
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in ("latency", "memory"):
+            base = baseline[key][metric]
+            if base and result[metric] > base * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {result[metric]:.4g} > {base:.4g}")
+    return regressions
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark runners over synthetic workspaces")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Runs of every benchmark, best one is taken")
+    parser.add_argument("-w", "--workspace", action="append", help="Run only given synthetic workspaces")
+    parser.add_argument("--save", metavar="PATH", help="Save results as baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare results with baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Allowed relative regression")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = create_parser().parse_args(argv)
+    results = run(args.repeat, args.workspace)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline: dict[str, Any] = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
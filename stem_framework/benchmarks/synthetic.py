@@ -0,0 +1,75 @@
+"""
+Synthetic workspaces for benchmarks of runners.
+Workspaces are built at import time, so worker processes find the same tasks by module and workspace name
+"""
+import time
+from typing import Any
+
+from stem.meta import Meta
+from stem.task import FunctionTask, FunctionDataTask
+from stem.workspace import Workspace, IWorkspace
+
+SLEEP = "sleep"
+CPU = "cpu"
+
+
+def _work(cost: float, mode: str):
+    if mode == SLEEP:
+        time.sleep(cost)
+    else:
+        end = time.thread_time() + cost
+        while time.thread_time() < end:
+            pass
+
+
+def _source(cost: float, mode: str, payload: int):
+    def source(meta: Meta) -> bytes:
+        _work(cost, mode)
+        return bytes(payload)
+
+    return source
+
+
+def _node(cost: float, mode: str, payload: int):
+    def node(meta: Meta, **kwargs: bytes) -> bytes:
+        _work(cost, mode)
+        return bytes(payload)
+
+    return node
+
+
+def _root(meta: Meta, **kwargs: Any) -> int:
+    return sum(len(value) for value in kwargs.values())
+
+
+def synthetic_workspace(name: str, width: int = 4, depth: int = 3, fan_in: int = 2,
+                        cost: float = 0.001, mode: str = SLEEP, payload: int = 1024,
+                        module: str = __name__) -> IWorkspace:
+    """
+    Build workspace of depth layers with width tasks, every task depends on fan_in tasks of previous layer
+    and returns payload bytes after cost seconds of sleep or CPU work. Task "root" depends on the last layer
+    """
+    tasks = {}
+    for i in range(width):
+        tasks[f"t0_{i}"] = FunctionDataTask(f"t0_{i}", _source(cost, mode, payload))
+    for layer in range(1, depth):
+        for i in range(width):
+            dependencies = tuple(f"t{layer - 1}_{(i + j) % width}" for j in range(min(fan_in, width)))
+            tasks[f"t{layer}_{i}"] = FunctionTask(f"t{layer}_{i}", _node(cost, mode, payload), dependencies)
+    tasks["root"] = FunctionTask("root", _root, tuple(f"t{depth - 1}_{i}" for i in range(width)))
+    for t in tasks.values():
+        t.__module__ = module
+    return Workspace(name, (), dict(tasks, __module__=module))
+
+
+def task_count(workspace: IWorkspace) -> int:
+    return len(workspace.tasks)
+
+
+CHAIN = synthetic_workspace("CHAIN", width=1, depth=16, fan_in=1)
+WIDE = synthetic_workspace("WIDE", width=32, depth=1)
+MESH = synthetic_workspace("MESH", width=8, depth=4, fan_in=4)
+CPU_MESH = synthetic_workspace("CPU_MESH", width=8, depth=3, fan_in=2, cost=0.005, mode=CPU)
+PAYLOAD = synthetic_workspace("PAYLOAD", width=4, depth=3, fan_in=2, cost=0, payload=4 * 1024 * 1024)
+
+WORKSPACES = [CHAIN, WIDE, MESH, CPU_MESH, PAYLOAD]
@@ -0,0 +1,107 @@
+"""
+Fan-out of one iterator to several consumers
+"""
+import pickle
+import tempfile
+from collections import deque
+from collections.abc import Iterator
+from threading import Lock
+from typing import Any, Iterable, Optional, IO
+
+
+class Broadcast:
+    """
+    Reads source once and feeds every consumer with all its items.
+    At most window items are kept in memory, older items which are not read by all consumers yet
+    are spilled to temporary file
+    """
+    WINDOW = 1024
+
+    def __init__(self, source: Iterable, consumers: int,
+                 window: Optional[int] = None, spill_dir: Optional[str] = None):
+        self._source = iter(source)
+        self._window = window or Broadcast.WINDOW
+        self._spill_dir = spill_dir
+        self._lock = Lock()
+        self._positions = [0] * consumers
+        self._memory: deque = deque()
+        self._memory_start = 0
+        self._spill: Optional[IO[bytes]] = None
+        self._spilled: dict[int, int] = {}
+        self._spill_start = 0
+        self._exhausted = False
+        self.consumers = [_Consumer(self, i) for i in range(consumers)]
+
+    @property
+    def spilled(self) -> int:
+        """
+        Number of items which are on disk now
+        """
+        return len(self._spilled)
+
+    def _next(self, consumer: int) -> Any:
+        with self._lock:
+            position = self._positions[consumer]
+            if position < self._memory_start:
+                item = self._read(self._spilled[position])
+            elif position < self._memory_start + len(self._memory):
+                item = self._memory[position - self._memory_start]
+            elif self._exhausted:
+                raise StopIteration
+            else:
+                try:
+                    item = next(self._source)
+                except StopIteration:
+                    self._exhausted = True
+                    raise
+                self._memory.append(item)
+            self._positions[consumer] = position + 1
+            self._release()
+            return item
+
+    def _close(self, consumer: int):
+        with self._lock:
+            self._positions[consumer] = float("inf")
+            self._release()
+
+    def _release(self):
+        low = min(self._positions)
+        while self._spill_start < min(low, self._memory_start):
+            self._spilled.pop(self._spill_start, None)
+            self._spill_start += 1
+        while self._memory and self._memory_start < low:
+            self._memory.popleft()
+            self._memory_start += 1
+        while len(self._memory) > self._window:
+            self._spilled[self._memory_start] = self._write(self._memory.popleft())
+            self._memory_start += 1
+        if self._spill is not None and not self._spilled:
+            self._spill.seek(0)
+            self._spill.truncate()
+
+    def _write(self, item: Any) -> int:
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(dir=self._spill_dir)
+        self._spill.seek(0, 2)
+        offset = self._spill.tell()
+        pickle.dump(item, self._spill, protocol=pickle.HIGHEST_PROTOCOL)
+        return offset
+
+    def _read(self, offset: int) -> Any:
+        self._spill.seek(offset)
+        return pickle.load(self._spill)
+
+
+class _Consumer(Iterator):
+    def __init__(self, broadcast: Broadcast, index: int):
+        self._broadcast = broadcast
+        self._index = index
+
+    def __next__(self):
+        return self._broadcast._next(self._index)
+
+    def close(self):
+        """
+        Stop consuming, items are not kept for this consumer anymore
+        """
+        self._broadcast._close(self._index)
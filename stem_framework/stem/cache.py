@@ -0,0 +1,284 @@
+"""
+Caches of task results keyed by task fingerprint, meta and keys of dependencies
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+from collections import OrderedDict
+from collections.abc import Iterator
+from enum import Enum, auto
+from threading import Lock
+from types import CodeType
+from typing import Any, Callable, Iterable, Optional, Protocol
+from weakref import WeakKeyDictionary
+
+from stem.meta import Meta, IdentityKey, meta_key
+from stem.task import Task
+
+
+def _update_by_code(h, code: CodeType):
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _update_by_code(h, const)
+        else:
+            h.update(repr(const).encode())
+
+
+def _update_by_func(h, func: Callable):
+    """
+    Hash code of func, ufuncs and builtins have no code and are hashed by module and qualified name
+    """
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        _update_by_code(h, code)
+    else:
+        name = getattr(func, "__qualname__", None) or getattr(func, "__name__", type(func).__qualname__)
+        h.update("{}.{}".format(getattr(func, "__module__", None), name).encode())
+
+
+_fingerprints: "WeakKeyDictionary[Task, str]" = WeakKeyDictionary()
+FINGERPRINT_SETTINGS = ("vectorized", "batch_size")
+
+
+def task_fingerprint(task: Task) -> str:
+    """
+    Return hash of task identity, its code and settings which change its result
+    """
+    task = getattr(task, "_task", task)
+    if task in _fingerprints:
+        return _fingerprints[task]
+    h = hashlib.sha256()
+    h.update("{}.{}:{}".format(type(task).__module__, type(task).__qualname__, task.name).encode())
+    for setting in FINGERPRINT_SETTINGS:
+        h.update("{}={!r};".format(setting, getattr(task, setting, None)).encode())
+    func = getattr(task, "_func", None)
+    if func is not None:
+        _update_by_func(h, func)
+    else:
+        for _, method in sorted(vars(type(task)).items()):
+            if inspect.isfunction(method):
+                _update_by_code(h, method.__code__)
+    _fingerprints[task] = h.hexdigest()
+    return _fingerprints[task]
+
+
+RUNTIME_META_KEYS = ("workspace", "task_master")
+
+
+def _keyed_meta(meta: Any) -> Any:
+    """
+    Return meta without workspace and task master which are passed in meta by units
+    """
+    if not isinstance(meta, dict):
+        return meta
+    return {k: v for k, v in meta.items() if k not in RUNTIME_META_KEYS}
+
+
+def _keyed_by_identity(key: Any) -> bool:
+    """
+    Check if meta key has value which is equal only to itself, like object with default repr
+    """
+    if isinstance(key, IdentityKey):
+        return True
+    if isinstance(key, (tuple, frozenset)):
+        return any(_keyed_by_identity(k) for k in key)
+    return type(key).__repr__ is object.__repr__
+
+
+def result_key(task: Task, meta: Meta, dependencies: Iterable[Optional[str]] = ()) -> Optional[str]:
+    """
+    Return key of task result from task fingerprint, canonical meta and keys of dependencies results.
+    Result is not cacheable and None is returned if meta has value without content key or dependency has no key
+    """
+    keyed = meta_key(_keyed_meta(meta))
+    if _keyed_by_identity(keyed):
+        return None
+    h = hashlib.sha256()
+    h.update(task_fingerprint(task).encode())
+    h.update(repr(keyed).encode())
+    for key in dependencies:
+        if key is None:
+            return None
+        h.update(key.encode())
+    return h.hexdigest()
+
+
+class Cache(Protocol):
+    """
+    Interface of task result caches, it is implemented by ResultCache and MemoryCache
+    """
+
+    def __contains__(self, key: str) -> bool:
+        ...
+
+    def get(self, key: str) -> Any:
+        ...
+
+    def put(self, key: str, value: Any) -> Any:
+        ...
+
+    def clear(self):
+        ...
+
+
+class ResultCache:
+    """
+    Content-addressed cache of task results on local disk.
+    When total size exceeds max_size least recently used results are removed.
+    Iterators are saved as lists and returned as new iterators
+    """
+    MAX_SIZE = 1024 * 1024 * 1024  # 1 Gb
+
+    def __init__(self, path: str, max_size: int = MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + ".pkl")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._file(key))
+
+    def get(self, key: str) -> Any:
+        try:
+            with open(self._file(key), "rb") as f:
+                is_iterator, value = pickle.load(f)
+        except FileNotFoundError:
+            raise KeyError(key)
+        os.utime(self._file(key))
+        return iter(value) if is_iterator else value
+
+    def put(self, key: str, value: Any) -> Any:
+        """
+        Save value and return it, iterator is consumed and returned as new iterator
+        """
+        is_iterator = isinstance(value, Iterator)
+        if is_iterator:
+            value = list(value)
+        try:
+            data = pickle.dumps((is_iterator, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return iter(value) if is_iterator else value
+        fd, tmp = tempfile.mkstemp(dir=self.path)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._file(key))
+        self._evict()
+        return iter(value) if is_iterator else value
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pkl"):
+                os.remove(entry.path)
+
+
+def sizeof(obj: Any) -> int:
+    """
+    Estimate size of object in bytes, NumPy arrays are measured by nbytes and containers with their items
+    """
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return max(sys.getsizeof(obj), nbytes)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sizeof(k) + sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(sizeof(item) for item in obj)
+    return size
+
+
+class EvictionPolicy(Enum):
+    LRU = auto()
+    LFU = auto()
+
+
+class MemoryCache:
+    """
+    Process-local cache of task results with budget in bytes.
+    Has the same interface as ResultCache and counts hits and misses
+    """
+    MAX_SIZE = 256 * 1024 * 1024  # 256 Mb
+
+    def __init__(self, max_size: int = MAX_SIZE, policy: EvictionPolicy = EvictionPolicy.LRU):
+        self.max_size = max_size
+        self.policy = policy
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._values: OrderedDict[str, tuple[bool, Any, int]] = OrderedDict()
+        self._uses: dict[str, int] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            try:
+                is_iterator, value, _ = self._values[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.hits += 1
+            self._values.move_to_end(key)
+            self._uses[key] += 1
+        return iter(value) if is_iterator else value
+
+    def put(self, key: str, value: Any) -> Any:
+        """
+        Save value and return it, iterator is consumed and returned as new iterator
+        """
+        is_iterator = isinstance(value, Iterator)
+        if is_iterator:
+            value = list(value)
+        size = sizeof(value)
+        with self._lock:
+            self._remove(key)
+            if size <= self.max_size:
+                self._values[key] = is_iterator, value, size
+                self._uses[key] = 1
+                self.size += size
+                while self.size > self.max_size:
+                    self._remove(self._victim())
+        return iter(value) if is_iterator else value
+
+    def _victim(self) -> str:
+        if self.policy is EvictionPolicy.LFU:
+            return min(self._values, key=self._uses.__getitem__)
+        return next(iter(self._values))
+
+    def _remove(self, key: str):
+        if key in self._values:
+            self.size -= self._values.pop(key)[2]
+            del self._uses[key]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._uses.clear()
+            self.size = 0
@@ -0,0 +1,201 @@
+"""
+Streaming compression of Envelope data by zlib, lzma or bz2
+"""
+import bz2
+import lzma
+import zlib
+from itertools import chain
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional
+
+COMPRESSION_KEY = "_compression"  # reserved meta key with name of compression of data
+SIZE_KEY = "_size"  # reserved meta key with size of decompressed data of frame
+
+_COMPRESSORS: dict[str, tuple[Callable[[], Any], Callable[[], Any]]] = {
+    "zlib": (zlib.compressobj, zlib.decompressobj),
+    "lzma": (lzma.LZMACompressor, lzma.LZMADecompressor),
+    "bz2": (bz2.BZ2Compressor, bz2.BZ2Decompressor),
+}
+
+THRESHOLD = 4 * 1024  # smaller data is sent as is
+SAMPLE_SIZE = 64 * 1024
+MAX_RATIO = 0.9  # data which sample is compressed worse than this is sent as is
+PIECE_SIZE = 1024 * 1024
+
+
+def compressor(name: str) -> Any:
+    try:
+        return _COMPRESSORS[name][0]()
+    except KeyError:
+        raise ValueError(f"Unknown compression {name!r}") from None
+
+
+def decompressor(name: str) -> Any:
+    try:
+        return _COMPRESSORS[name][1]()
+    except KeyError:
+        raise ValueError(f"Unknown compression {name!r}") from None
+
+
+def worth_compressing(data: memoryview, threshold: int = THRESHOLD) -> bool:
+    """
+    Check size of data and compression ratio of its sample by fast zlib level
+    """
+    if data.nbytes < threshold:
+        return False
+    sample = data[:SAMPLE_SIZE]
+    return len(zlib.compress(sample, 1)) < MAX_RATIO * sample.nbytes
+
+
+def sample(chunks: Iterator) -> tuple[memoryview, Iterator]:
+    """
+    Take chunks from the start of stream until SAMPLE_SIZE bytes, return sample of them and the whole stream
+    """
+    taken, parts, size = [], [], 0
+    for chunk in chunks:
+        taken.append(chunk)
+        parts.append(memoryview(chunk).cast("B")[:SAMPLE_SIZE - size])
+        size += parts[-1].nbytes
+        if size >= SAMPLE_SIZE:
+            break
+    return memoryview(b"".join(parts)), chain(taken, chunks)
+
+
+async def _async_chain(taken: list, chunks: AsyncIterator) -> AsyncIterator:
+    for chunk in taken:
+        yield chunk
+    async for chunk in chunks:
+        yield chunk
+
+
+async def async_sample(chunks: AsyncIterator) -> tuple[memoryview, AsyncIterator]:
+    taken, parts, size = [], [], 0
+    async for chunk in chunks:
+        taken.append(chunk)
+        parts.append(memoryview(chunk).cast("B")[:SAMPLE_SIZE - size])
+        size += parts[-1].nbytes
+        if size >= SAMPLE_SIZE:
+            break
+    return memoryview(b"".join(parts)), _async_chain(taken, chunks)
+
+
+def compress(data: memoryview, name: str) -> list[bytes]:
+    """
+    Compress data piece by piece and return compressed pieces without joining them
+    """
+    c = compressor(name)
+    pieces = [c.compress(data[start:start + PIECE_SIZE]) for start in range(0, data.nbytes, PIECE_SIZE)]
+    pieces.append(c.flush())
+    return [piece for piece in pieces if piece]
+
+
+def compress_chunks(chunks: Iterable, name: str) -> Iterator[bytes]:
+    c = compressor(name)
+    for chunk in chunks:
+        piece = c.compress(chunk)
+        if piece:
+            yield piece
+    piece = c.flush()
+    if piece:
+        yield piece
+
+
+async def async_compress_chunks(chunks: AsyncIterator, name: str) -> AsyncIterator[bytes]:
+    c = compressor(name)
+    async for chunk in chunks:
+        piece = c.compress(chunk)
+        if piece:
+            yield piece
+    piece = c.flush()
+    if piece:
+        yield piece
+
+
+def _inflate(d: Any, piece: Any) -> Iterator[bytes]:
+    """
+    Decompress piece by outputs of at most PIECE_SIZE bytes, so highly compressed piece is not expanded at once
+    """
+    while True:
+        out = d.decompress(piece, PIECE_SIZE)
+        if out:
+            yield out
+        if hasattr(d, "unconsumed_tail"):
+            piece = d.unconsumed_tail
+            if not piece:
+                return
+        elif d.eof or d.needs_input:
+            return
+        else:
+            piece = b""
+
+
+def _check_end(d: Any):
+    if not d.eof:
+        raise ValueError("Compressed data is truncated")
+
+
+def decompress_chunks(chunks: Iterable, name: str) -> Iterator[memoryview]:
+    """
+    Decompress chunks as they come, decompressed pieces are yielded at once and are at most PIECE_SIZE bytes
+    """
+    d = decompressor(name)
+    for chunk in chunks:
+        for piece in _inflate(d, chunk):
+            yield memoryview(piece)
+    _check_end(d)
+
+
+async def async_decompress_chunks(chunks: AsyncIterator, name: str) -> AsyncIterator[memoryview]:
+    d = decompressor(name)
+    async for chunk in chunks:
+        for piece in _inflate(d, chunk):
+            yield memoryview(piece)
+    _check_end(d)
+
+
+class _Inflater:
+    """
+    Decompresses pieces into buffer of declared size, data which decompresses to more is rejected
+    """
+
+    def __init__(self, name: str, out: memoryview):
+        self._d = decompressor(name)
+        self._out = out
+        self._position = 0
+
+    def feed(self, piece: Any):
+        for part in _inflate(self._d, piece):
+            end = self._position + len(part)
+            if end > len(self._out):
+                raise ValueError("Compressed data is larger than declared size")
+            self._out[self._position:end] = part
+            self._position = end
+
+    def close(self) -> memoryview:
+        _check_end(self._d)
+        if self._position != len(self._out):
+            raise ValueError("Compressed data is smaller than declared size")
+        return self._out
+
+
+def decompress_into(pieces: Iterable, name: str, out: memoryview) -> memoryview:
+    inflater = _Inflater(name, out)
+    for piece in pieces:
+        inflater.feed(piece)
+    return inflater.close()
+
+
+async def async_decompress_into(pieces: AsyncIterator, name: str, out: memoryview) -> memoryview:
+    inflater = _Inflater(name, out)
+    async for piece in pieces:
+        inflater.feed(piece)
+    return inflater.close()
+
+
+def split_compression(meta: Any) -> tuple[Any, Optional[str], Optional[int]]:
+    """
+    Remove reserved compression keys from meta and return meta, name of compression and size of decompressed data
+    """
+    if isinstance(meta, dict) and COMPRESSION_KEY in meta:
+        meta = dict(meta)
+        return meta, meta.pop(COMPRESSION_KEY), meta.pop(SIZE_KEY, None)
+    return meta, None, None
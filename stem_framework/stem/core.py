@@ -1,5 +1,6 @@
 from typing import Optional, Any, Protocol
 import re
+import weakref
 
 
 def pascal_case_to_snake_case(name: str) -> str:
@@ -29,3 +30,29 @@ class Dataclass(Protocol):
     Dataclass protocol
     """
     __dataclass_fields__: Any
+
+
+_definitions: dict[int, tuple[weakref.ref, str]] = {}
+
+
+def register_definition(obj: Any, kind: str):
+    """
+    Remember task or workspace when it is created, the entry is removed when object is collected
+    """
+    key = id(obj)
+
+    def forget(ref: weakref.ref):
+        if _definitions.get(key, (None,))[0] is ref:
+            del _definitions[key]
+
+    _definitions[key] = weakref.ref(obj, forget), kind
+
+
+def definition_kind(obj: Any) -> Optional[str]:
+    """
+    Return kind of registered task or workspace or None for any other object
+    """
+    entry = _definitions.get(id(obj))
+    if entry is None or entry[0]() is not obj:
+        return None
+    return entry[1]
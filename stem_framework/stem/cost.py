@@ -0,0 +1,92 @@
+"""
+Cost model of tasks from observed durations
+"""
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from stem.meta import Meta, get_meta_attr, meta_key
+from stem.task_tree import TaskNode
+
+
+def meta_signature(meta: Meta) -> str:
+    """
+    Return short stable hash of canonical meta
+    """
+    return hashlib.sha1(repr(meta_key(meta)).encode()).hexdigest()[:16]
+
+
+@dataclass
+class Estimate:
+    total: float
+    critical_path: float
+
+    def for_workers(self, workers: int) -> float:
+        """
+        Lower bound of run time on given number of workers
+        """
+        return max(self.critical_path, self.total / max(workers, 1))
+
+
+def estimate(meta: Meta, task_node: TaskNode, cost_model: "CostModel") -> Estimate:
+    """
+    Estimate total work and critical path of task node, node with the same meta is counted once like in runners
+    """
+    costs: dict[tuple, float] = {}
+    paths: dict[tuple, float] = {}
+
+    def visit(meta: Meta, node: TaskNode) -> float:
+        key = TaskNode.key(node.task, node.workspace), meta_key(meta)
+        if key not in paths:
+            costs[key] = cost_model.cost(node.task.name, meta)
+            paths[key] = costs[key] + max((visit(get_meta_attr(meta, dep.task.name, {}), dep)
+                                           for dep in node.dependencies), default=0.0)
+        return paths[key]
+
+    critical_path = visit(meta, task_node)
+    return Estimate(total=sum(costs.values()), critical_path=critical_path)
+
+
+class CostModel:
+    """
+    Mean durations of tasks in seconds keyed by task name and meta signature, kept in JSON file at path.
+    Unknown meta falls back to mean of the task over all metas and unknown task to DEFAULT
+    """
+    DEFAULT = 0.001
+
+    def __init__(self, path: Optional[str] = None, default: Optional[float] = None):
+        self.path = path
+        self.default = default if default is not None else CostModel.DEFAULT
+        self._lock = Lock()
+        self._durations: dict[str, dict[str, list[float]]] = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self._durations = json.load(f)
+
+    def observe(self, task: str, meta: Meta, duration: float):
+        with self._lock:
+            count, mean = self._durations.setdefault(task, {}).get(meta_signature(meta), (0, 0.0))
+            self._durations[task][meta_signature(meta)] = [count + 1, mean + (duration - mean) / (count + 1)]
+
+    def cost(self, task: str, meta: Meta) -> float:
+        with self._lock:
+            by_meta = self._durations.get(task)
+            if not by_meta:
+                return self.default
+            observed = by_meta.get(meta_signature(meta))
+            if observed is not None:
+                return observed[1]
+            return sum(mean for _, mean in by_meta.values()) / len(by_meta)
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        with self._lock:
+            data = json.dumps(self._durations)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
@@ -1,98 +1,396 @@
 import array
-import json
+import io
 import mmap
-import sys
-from io import BytesIO
-from asyncio import StreamReader, StreamWriter
-from dataclasses import is_dataclass
+import os
+import struct
+import tempfile
+from asyncio import StreamReader, StreamWriter, IncompleteReadError
 from io import RawIOBase, BufferedReader
-from json import JSONEncoder
-from typing import Optional, Union, Any
+from typing import Optional, Union, Any, Iterable, Iterator, AsyncIterable, AsyncIterator
+from weakref import WeakKeyDictionary
 from stem.meta import Meta
+from stem.meta_codec import MetaEncoder, JSON, get_codec
+from stem.compression import COMPRESSION_KEY, SIZE_KEY, PIECE_SIZE, worth_compressing, sample, async_sample, \
+    compress, compress_chunks, async_compress_chunks, decompress_into, async_decompress_into, decompress_chunks, \
+    async_decompress_chunks, split_compression
 
 Binary = Union[bytes, bytearray, memoryview, array.array, mmap.mmap]
 
+_HEADER = struct.Struct(">2s4s2sII4s")  # '#~', type, meta type, meta length, data length, '~#\r\n'
+_CHUNK = struct.Struct(">I")
+_MAX_CHUNK = 2 ** 32 - 1
+
+
+def _iov_max() -> int:
+    try:
+        value = os.sysconf("SC_IOV_MAX")
+    except (AttributeError, ValueError, OSError):
+        value = -1
+    return value if value > 0 else 1024
+
+
+_IOV_MAX = _iov_max()  # buffers accepted by one sendmsg call
+
+FRAME = b"DF02"
+STREAM = b"DS02"  # data is sequence of chunks prefixed by length and ended by empty chunk
+
+Chunks = Union[Iterable[Binary], AsyncIterable[Binary]]
+
+
+def _readinto(input: BufferedReader, view: memoryview):
+    """
+    Fill view from input, short reads are repeated until view is full
+    """
+    while view:
+        n = input.readinto(view)
+        if not n:
+            raise EOFError("Envelope is truncated")
+        view = view[n:]
+
+
+def _allocate(size: int, temp_dir: Optional[str] = None) -> memoryview:
+    """
+    Return writable buffer of size bytes backed by anonymous mmap or by mmap of temporary file in temp_dir
+    """
+    if temp_dir is None:
+        return memoryview(mmap.mmap(-1, size))
+    with tempfile.TemporaryFile(dir=temp_dir) as f:
+        f.truncate(size)
+        return memoryview(mmap.mmap(f.fileno(), size))
+
+
+def _buffer(size: int) -> memoryview:
+    """
+    Return buffer for size bytes of received data, large data is backed by mmap
+    """
+    return memoryview(bytearray(size)) if size < Envelope._MAX_SIZE else _allocate(size, Envelope.TEMP_DIR)
+
+
+def _declared(size: Optional[int]) -> int:
+    if not isinstance(size, int) or size < 0:
+        raise ValueError("Compressed envelope has no size of data")
+    return size
+
+
+def _map_file(input: Any, size: int) -> Optional[memoryview]:
+    """
+    Return read-only view of next size bytes of regular file without reading them or None for other streams
+    """
+    try:
+        position = input.tell()
+        fileno = input.fileno()
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+    if position + size > len(mapped):
+        mapped.close()
+        return None
+    input.seek(position + size)
+    return memoryview(mapped)[position:position + size]
+
+
+def _write(output: Any, buffers: list[memoryview]):
+    if hasattr(output, "sendmsg"):
+        _sendmsg(output, buffers)
+    else:
+        output.writelines(buffers)
+
+
+def _chunk_buffers(chunk: Binary) -> list[memoryview]:
+    """
+    Return length prefixed pieces of chunk, chunk longer than 4 Gb is split
+    """
+    view = memoryview(chunk).cast("B")
+    buffers = []
+    for start in range(0, view.nbytes, _MAX_CHUNK):
+        piece = view[start:start + _MAX_CHUNK]
+        buffers += [memoryview(_CHUNK.pack(piece.nbytes)), piece]
+    return buffers
+
+
+def _read_chunks(input: BufferedReader) -> Iterator[memoryview]:
+    prefix = memoryview(bytearray(_CHUNK.size))
+    while True:
+        _readinto(input, prefix)
+        size, = _CHUNK.unpack(prefix)
+        if size == 0:
+            return
+        chunk = _buffer(size)
+        _readinto(input, chunk)
+        yield chunk
+
+
+def _read_pieces(input: BufferedReader, length: int) -> Iterator[memoryview]:
+    """
+    Read length bytes by pieces into one reused buffer, every piece is valid until the next one
+    """
+    buffer = memoryview(bytearray(min(length, PIECE_SIZE)))
+    while length:
+        piece = buffer[:min(length, len(buffer))]
+        _readinto(input, piece)
+        length -= len(piece)
+        yield piece
 
-class MetaEncoder(JSONEncoder):
-    def default(self, obj: Meta) -> Any:
-        if is_dataclass(obj):
-            return obj.__dict__
-        else:
-            return json.JSONEncoder.default(self, obj)
+
+def _view_chunks(view: memoryview) -> Iterator[memoryview]:
+    while True:
+        size, = _CHUNK.unpack_from(view)
+        if size == 0:
+            return
+        yield view[_CHUNK.size:_CHUNK.size + size]
+        view = view[_CHUNK.size + size:]
+
+
+def _sendmsg(sock: Any, buffers: list[memoryview]):
+    """
+    Send all buffers by scatter/gather writes of at most _IOV_MAX buffers,
+    partially sent buffer is resent from the rest
+    """
+    start = 0
+    while start < len(buffers):
+        sent = sock.sendmsg(buffers[start:start + _IOV_MAX])
+        while start < len(buffers) and sent >= buffers[start].nbytes:
+            sent -= buffers[start].nbytes
+            start += 1
+        if sent:
+            buffers[start] = buffers[start][sent:]
 
 
 class Envelope:
+    """
+    Frame of meta and binary data. Data of _MAX_SIZE bytes and more is read into its own mmap
+    outside of Python heap, file-backed in TEMP_DIR if it is set, or mapped directly from regular file.
+    Envelope which data is iterator of chunks is sent as stream of unknown length.
+    Streams are read as iterator of chunks by read and as async iterator by async_read,
+    the stream must be consumed before the next envelope is read from the same input.
+    Data of envelope with dict meta is compressed by given compression if its sample compresses well,
+    name of compression and size of frame data are sent in reserved meta keys,
+    readers decompress data as it arrives into buffer of declared size
+    """
     _MAX_SIZE = 128*1024*1024  # 128 Mb
+    TEMP_DIR: Optional[str] = None
 
-    def __init__(self, meta: Meta, data: Optional[Binary] = b''):
+    def __init__(self, meta: Meta, data: Optional[Union[Binary, Chunks]] = b'', meta_type: bytes = JSON,
+                 compression: Optional[str] = None):
         self.meta = meta
-        if sys.getsizeof(data) >= self._MAX_SIZE:
-            file_name = 'data.txt'
-            with open('../data_files/{}'.format(file_name), 'wb') as f:
-                f.write(data)
-            with open('../data_files/{}'.format(file_name), 'rb') as f:
-                with mmap.mmap(f.fileno(), length=0, access=mmap.ACCESS_READ) as mmap_obj:
-                    self.data = mmap_obj.read()
-        else:
-            self.data = data
+        self.data = data
+        self.meta_type = meta_type
+        self.compression = compression
+
+    @property
+    def is_stream(self) -> bool:
+        return isinstance(self.data, (Iterator, AsyncIterator))
 
     def __str__(self):
         return str(self.meta)
 
     @staticmethod
     def read(input: BufferedReader) -> "Envelope":
-        input.read(2)
-        type = input.read(4).decode("utf-8")
-        meta_type = input.read(2).decode("utf-8")
-        meta_length = int.from_bytes(input.read(4), byteorder='big')
-        data_length = int.from_bytes(input.read(4), byteorder='big')
-        input.read(4)
-        meta = json.loads(input.read(meta_length).decode(
-            "utf-8").replace("'", "\""))
-
-        if data_length >= Envelope._MAX_SIZE:
-            with mmap.mmap(input.fileno(), length=0, access=mmap.ACCESS_READ) as mmap_obj:
-                data = mmap_obj.read(data_length)
+        header = bytearray(_HEADER.size)
+        _readinto(input, memoryview(header))
+        _, type, meta_type, meta_length, data_length, _ = _HEADER.unpack(header)
+        meta = bytearray(meta_length)
+        _readinto(input, memoryview(meta))
+        meta, compression, size = split_compression(get_codec(meta_type).decode(memoryview(meta)))
+
+        if type == STREAM:
+            if compression is not None:
+                return Envelope(meta, decompress_chunks(_read_chunks(input), compression), meta_type, compression)
+            return Envelope(meta, _read_chunks(input), meta_type)
+        if compression is not None:
+            data = decompress_into(_read_pieces(input, data_length), compression, _buffer(_declared(size)))
+            return Envelope(meta, data, meta_type, compression)
+        if data_length < Envelope._MAX_SIZE:
+            data = memoryview(bytearray(data_length))
         else:
-            data = input.read(data_length)
-        return Envelope(meta, data)
+            data = _map_file(input, data_length)
+            if data is not None:
+                return Envelope(meta, data, meta_type)
+            data = _allocate(data_length, Envelope.TEMP_DIR)
+        _readinto(input, data)
+        return Envelope(meta, data, meta_type)
 
     @staticmethod
-    def from_bytes(buffer: bytes) -> "Envelope":
-        f = BytesIO(buffer)
-        return Envelope.read(f)
+    def from_bytes(buffer: Binary) -> "Envelope":
+        """
+        Parse envelope from buffer, data is a view of buffer without copy
+        """
+        view = memoryview(buffer).cast("B")
+        _, type, meta_type, meta_length, data_length, _ = _HEADER.unpack_from(view)
+        start = _HEADER.size + meta_length
+        meta, compression, size = split_compression(get_codec(meta_type).decode(view[_HEADER.size:start]))
+        if type == STREAM:
+            if compression is not None:
+                return Envelope(meta, decompress_chunks(_view_chunks(view[start:]), compression), meta_type,
+                                compression)
+            return Envelope(meta, _view_chunks(view[start:]), meta_type)
+        if compression is not None:
+            data = decompress_into([view[start:start + data_length]], compression, _buffer(_declared(size)))
+            return Envelope(meta, data, meta_type, compression)
+        return Envelope(meta, view[start:start + data_length], meta_type)
+
+    def _compression_for(self, data: memoryview) -> Optional[str]:
+        if self.compression is None or not isinstance(self.meta, dict):
+            return None
+        return self.compression if worth_compressing(data) else None
+
+    def _head(self, type: bytes, data_length: int, compression: Optional[str] = None,
+              size: Optional[int] = None) -> list[memoryview]:
+        meta = self.meta
+        if compression is not None:
+            meta = dict(meta, **{COMPRESSION_KEY: compression})
+        if size is not None:
+            meta[SIZE_KEY] = size
+        meta = get_codec(self.meta_type).encode(meta)
+        header = _HEADER.pack(b"#~", type, self.meta_type, len(meta), data_length, b"~#\r\n")
+        return [memoryview(header), memoryview(meta)]
+
+    def buffers(self) -> list[memoryview]:
+        """
+        Return header, meta and data of frame as separate buffers, data is not copied.
+        Chunks of stream are consumed
+        """
+        if self.is_stream:
+            buffers, chunks = self._stream_head()
+            for chunk in chunks:
+                buffers += _chunk_buffers(chunk)
+            return buffers + [memoryview(_CHUNK.pack(0))]
+        data = memoryview(self.data).cast("B")
+        compression = self._compression_for(data)
+        if compression is None:
+            return self._head(FRAME, data.nbytes) + [data]
+        pieces = [memoryview(piece) for piece in compress(data, compression)]
+        return self._head(FRAME, sum(piece.nbytes for piece in pieces), compression, data.nbytes) + pieces
+
+    def _stream_head(self) -> tuple[list[memoryview], Iterator]:
+        head, chunks = sample(iter(self.data))
+        compression = self._compression_for(head)
+        if compression is not None:
+            chunks = compress_chunks(chunks, compression)
+        return self._head(STREAM, 0, compression), chunks
 
     def to_bytes(self) -> bytes:
-        type = b"DF02"
-        meta_type = b"DI"
-        meta = json.dumps(self.meta, cls=MetaEncoder)
-        meta = str.encode(meta)
-        meta_length = len(meta).to_bytes(4, byteorder='big')
-        data_length = len(self.data).to_bytes(4, byteorder='big')
-        byte_string = b'#~' + type + meta_type + meta_length + data_length + b'~#\r\n'
-        byte_string += meta
-        byte_string += self.data
-        return byte_string
-
-    def write_to(self, output: RawIOBase):
-        output.write(self.to_bytes())
+        return b"".join(self.buffers())
+
+    def write_to(self, output: Union[RawIOBase, Any]):
+        """
+        Write frame to socket by sendmsg or to file object buffer by buffer, chunks of stream are written
+        as soon as iterator yields them
+        """
+        if not self.is_stream:
+            _write(output, self.buffers())
+            return
+        head, chunks = self._stream_head()
+        _write(output, head)
+        for chunk in chunks:
+            _write(output, _chunk_buffers(chunk))
+        _write(output, [memoryview(_CHUNK.pack(0))])
 
     @staticmethod
     async def async_read(reader: StreamReader) -> "Envelope":
-        await reader.read(2)
-        type = (await reader.read(4)).decode("utf-8")
-        meta_type = (await reader.read(2)).decode("utf-8")
-        meta_length = int.from_bytes(await reader.read(4), byteorder='big')
-        data_length = int.from_bytes(await reader.read(4), byteorder='big')
-        await reader.read(4)
-        meta = json.loads((await reader.read(meta_length)).decode("utf-8").replace("'", "\""))
-
-        if data_length >= Envelope._MAX_SIZE:
-            async with mmap.mmap(-1, length=0, access=mmap.ACCESS_READ) as mmap_obj:
-                data = await mmap_obj.read(data_length)
-        else:
-            data = await reader.read(data_length)
-        return Envelope(meta, data)
+        """
+        Read envelope by reader of connection, its buffer is reused by following reads from the same connection
+        """
+        return await EnvelopeReader.of(reader).read()
 
     async def async_write_to(self, writer: StreamWriter):
-        writer.write(self.to_bytes())
+        if not self.is_stream:
+            writer.writelines(self.buffers())
+            await writer.drain()
+            return
+        if not isinstance(self.data, AsyncIterator):
+            head, chunks = self._stream_head()
+            writer.writelines(head)
+            for chunk in chunks:
+                writer.writelines(_chunk_buffers(chunk))
+                await writer.drain()
+        else:
+            head, chunks = await async_sample(self.data)
+            compression = self._compression_for(head)
+            writer.writelines(self._head(STREAM, 0, compression))
+            if compression is not None:
+                chunks = async_compress_chunks(chunks, compression)
+            async for chunk in chunks:
+                writer.writelines(_chunk_buffers(chunk))
+                await writer.drain()
+        writer.write(_CHUNK.pack(0))
+        await writer.drain()
+
+
+class EnvelopeReader:
+    """
+    Reads envelopes from one connection. Meta and data are read into buffer which is reused between envelopes,
+    so data of envelope is a view which is valid until the next read. Large data is read into its own mmap
+    """
+    CHUNK_SIZE = 256 * 1024
+    _readers: "WeakKeyDictionary[StreamReader, EnvelopeReader]" = WeakKeyDictionary()
+
+    @staticmethod
+    def of(reader: StreamReader) -> "EnvelopeReader":
+        """
+        Return envelope reader of connection, it is created on first call and lives as long as the connection
+        """
+        envelope_reader = EnvelopeReader._readers.get(reader)
+        if envelope_reader is None:
+            envelope_reader = EnvelopeReader._readers[reader] = EnvelopeReader(reader)
+        return envelope_reader
+
+    def __init__(self, reader: StreamReader, chunk_size: Optional[int] = None):
+        self._reader = reader
+        self._buffer = bytearray()
+        self.chunk_size = chunk_size or EnvelopeReader.CHUNK_SIZE
+
+    async def _fill(self, view: memoryview):
+        expected = len(view)
+        while view:
+            chunk = await self._reader.read(min(len(view), self.chunk_size))
+            if not chunk:
+                raise IncompleteReadError(b"", expected)
+            view[:len(chunk)] = chunk
+            view = view[len(chunk):]
+
+    async def _chunks(self) -> AsyncIterator[memoryview]:
+        while True:
+            size, = _CHUNK.unpack(await self._reader.readexactly(_CHUNK.size))
+            if size == 0:
+                return
+            chunk = _buffer(size)
+            await self._fill(chunk)
+            yield chunk
+
+    async def _pieces(self, length: int) -> AsyncIterator[bytes]:
+        while length:
+            piece = await self._reader.read(min(length, self.chunk_size))
+            if not piece:
+                raise IncompleteReadError(b"", length)
+            length -= len(piece)
+            yield piece
+
+    def _view(self, size: int) -> memoryview:
+        if len(self._buffer) < size:
+            self._buffer = bytearray(size)
+        return memoryview(self._buffer)[:size]
+
+    async def read(self) -> Envelope:
+        """
+        Read next envelope, compressed data is decompressed piece by piece as it arrives
+        """
+        header = await self._reader.readexactly(_HEADER.size)
+        _, type, meta_type, meta_length, data_length, _ = _HEADER.unpack(header)
+        view = self._view(meta_length)
+        await self._fill(view)
+        meta, compression, declared = split_compression(get_codec(meta_type).decode(view))
+        if type == STREAM:
+            chunks = self._chunks()
+            if compression is not None:
+                chunks = async_decompress_chunks(chunks, compression)
+            return Envelope(meta, chunks, meta_type, compression)
+        if compression is not None:
+            data = await async_decompress_into(self._pieces(data_length), compression, _buffer(_declared(declared)))
+            return Envelope(meta, data, meta_type, compression)
+        if data_length < Envelope._MAX_SIZE:
+            data = self._view(data_length)
+        else:
+            data = _allocate(data_length, Envelope.TEMP_DIR)
+        await self._fill(data)
+        return Envelope(meta, data, meta_type)
@@ -0,0 +1,199 @@
+"""
+Accounting of memory held by task results with optional budget and spill to disk
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import tracemalloc
+from collections.abc import Iterator
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from stem.cache import sizeof
+
+
+@dataclass
+class MemoryRecord:
+    task: str
+    size: int = 0
+    allocated: Optional[int] = None
+    spilled: bool = False
+
+
+class Spilled:
+    """
+    Result saved to file, NumPy arrays are loaded back as read-only memory maps
+    """
+
+    def __init__(self, path: str, is_array: bool):
+        self.path = path
+        self.is_array = is_array
+
+    def load(self) -> Any:
+        if self.is_array:
+            import numpy as np
+
+            return np.load(self.path, mmap_mode="r")
+        with open(self.path, "rb") as f:
+            return pickle.load(f)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _is_array(value: Any) -> bool:
+    return type(value).__module__ == "numpy" and type(value).__name__ == "ndarray" and not value.dtype.hasobject
+
+
+_tracing_lock = Lock()
+_tracing_calls = 0
+_tracing_started = False
+
+
+def _start_tracing():
+    """
+    Start tracemalloc for measured call unless it is traced already
+    """
+    global _tracing_calls, _tracing_started
+    with _tracing_lock:
+        if _tracing_calls == 0:
+            _tracing_started = not tracemalloc.is_tracing()
+            if _tracing_started:
+                tracemalloc.start()
+        _tracing_calls += 1
+
+
+def _stop_tracing():
+    """
+    Stop tracemalloc after the last running measured call if it was started by measured calls
+    """
+    global _tracing_calls, _tracing_started
+    with _tracing_lock:
+        _tracing_calls -= 1
+        if _tracing_calls == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class MemoryMonitor:
+    """
+    Counts bytes of materialized results which are held for dependants and reports peak of them.
+    Result which doesn't fit into budget is spilled to file in spill_dir and loaded by dependants from there.
+    With trace_malloc allocations of every transform are measured by tracemalloc,
+    measurements overlap for concurrent tasks and are not taken in worker processes
+    """
+
+    def __init__(self, budget: Optional[int] = None, trace_malloc: bool = False, spill_dir: Optional[str] = None):
+        self.budget = budget
+        self.trace_malloc = trace_malloc
+        self.spill_dir = spill_dir
+        self.held = 0
+        self.peak = 0
+        self.allocated_peak = 0
+        self.records: list[MemoryRecord] = []
+        self._lock = Lock()
+        self._sizes: dict[Any, tuple[int, MemoryRecord]] = {}
+        self._own_dir: Optional[str] = None
+
+    def measure(self, task: str, func: Callable, *args) -> Any:
+        """
+        Call func with args and record allocations of task
+        """
+        if not self.trace_malloc:
+            return func(*args)
+        _start_tracing()
+        try:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            result = func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            _stop_tracing()
+        self._allocated(task, before, peak)
+        return result
+
+    async def async_measure(self, task: str, func: Callable, *args) -> Any:
+        """
+        Await result of func called with args and record allocations of task
+        """
+        if not self.trace_malloc:
+            return await func(*args)
+        _start_tracing()
+        try:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            result = await func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            _stop_tracing()
+        self._allocated(task, before, peak)
+        return result
+
+    def _allocated(self, task: str, before: int, peak: int):
+        with self._lock:
+            self.records.append(MemoryRecord(task, allocated=peak - before))
+            self.allocated_peak = max(self.allocated_peak, peak)
+
+    def hold(self, owner: Any, task: str, value: Any) -> Any:
+        """
+        Count value held by owner until release, return value or Spilled if budget is exceeded
+        """
+        if isinstance(value, Iterator) or value is None:
+            return value
+        size = sizeof(value)
+        record = MemoryRecord(task, size=size)
+        with self._lock:
+            self.records.append(record)
+            self._sizes[owner] = size, record
+            self.held += size
+            self.peak = max(self.peak, self.held)
+            if self.budget is None or self.held <= self.budget:
+                return value
+            self.held -= size
+            record.spilled = True
+        return self._spill(value)
+
+    def release(self, owner: Any, value: Any):
+        """
+        Stop counting value of owner, spilled file is removed
+        """
+        with self._lock:
+            size, record = self._sizes.pop(owner, (0, None))
+            if record is not None and not record.spilled:
+                self.held -= size
+        if isinstance(value, Spilled):
+            value.remove()
+
+    def _spill(self, value: Any) -> Spilled:
+        if self.spill_dir is None and self._own_dir is None:
+            self._own_dir = tempfile.mkdtemp(prefix="stem-spill-")
+        fd, path = tempfile.mkstemp(dir=self.spill_dir or self._own_dir)
+        with os.fdopen(fd, "wb") as f:
+            if _is_array(value):
+                import numpy as np
+
+                np.save(f, value, allow_pickle=False)
+            else:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return Spilled(path, _is_array(value))
+
+    def report(self) -> dict[str, Any]:
+        """
+        Return peak of held results, peak traced allocation and bytes by task
+        """
+        with self._lock:
+            by_task: dict[str, int] = {}
+            for record in self.records:
+                by_task[record.task] = max(by_task.get(record.task, 0), record.size, record.allocated or 0)
+            return {"peak": self.peak, "allocated_peak": self.allocated_peak,
+                    "spilled": sum(record.spilled for record in self.records), "tasks": by_task}
+
+    def close(self):
+        if self._own_dir is not None:
+            shutil.rmtree(self._own_dir, ignore_errors=True)
+            self._own_dir = None
@@ -1,8 +1,11 @@
 """
 Description conception of metadata and metadata processor
 """
-from dataclasses import dataclass, is_dataclass
-from typing import Optional, Any, Union
+import hashlib
+from dataclasses import dataclass, is_dataclass, fields
+from functools import lru_cache
+from types import UnionType
+from typing import Optional, Any, Union, Iterable, NamedTuple, get_origin, get_args, get_type_hints
 from stem.core import Dataclass
 
 Meta = Union[dict, Dataclass]
@@ -25,6 +28,79 @@ class MetaFieldError:
     presented_value: Any = None
 
 
+_MISSING = object()
+
+# Compiled specification: flat tuple of (key, types, compiled nested specification or None)
+_Validator = tuple[tuple[str, Optional[tuple[type, ...]], Optional["_Validator"]], ...]
+
+
+def _field_types(tp: Any) -> Optional[tuple[type, ...]]:
+    """
+    Return tuple of types for isinstance check or None if tp is nested specification
+    """
+    if tp is Any:
+        return object,
+    origin = get_origin(tp)
+    if origin is Union or origin is UnionType:
+        return tuple(t for arg in get_args(tp) for t in _field_types(arg) or ())
+    if origin is not None:
+        return origin,
+    if isinstance(tp, type):
+        return tp,
+    if isinstance(tp, tuple) and all(isinstance(t, type) for t in tp):
+        return tp
+    return None
+
+
+def _compile(specification: Optional[Specification]) -> _Validator:
+    if specification is None:
+        return ()
+    if is_dataclass(specification):
+        cls = specification if isinstance(specification, type) else type(specification)
+        try:
+            hints = get_type_hints(cls)
+        except Exception:
+            hints = {}
+        return tuple(v for f in fields(cls) for v in _compile((f.name, hints.get(f.name, f.type))))
+    if not isinstance(specification, tuple):
+        raise SpecificationError("Incorrect specification: {0!r}".format(specification))
+    if len(specification) == 2 and isinstance(specification[0], str):
+        key, tp = specification
+        types = _field_types(tp)
+        return (key, types, None if types is not None else compile_specification(tp)),
+    return tuple(v for field in specification for v in compile_specification(field))
+
+
+def compile_specification(specification: Optional[Specification]) -> _Validator:
+    """
+    Return flat validator of specification, it is compiled once per specification
+    """
+    try:
+        return _compile_cached(specification)
+    except TypeError:
+        return _compile(specification)
+
+
+@lru_cache(maxsize=None)
+def _compile_cached(specification: Specification) -> _Validator:
+    return _compile(specification)
+
+
+def _check(meta: Meta, validator: _Validator) -> list[Union["MetaFieldError", "MetaVerification"]]:
+    errors: list[Union[MetaFieldError, MetaVerification]] = []
+    for key, types, nested in validator:
+        value = get_meta_attr(meta, key, _MISSING)
+        if value is _MISSING:
+            errors.append(MetaFieldError(key, types))
+        elif nested is not None:
+            nested_errors = _check(value, nested)
+            if nested_errors:
+                errors.append(MetaVerification(*nested_errors))
+        elif not isinstance(value, types):
+            errors.append(MetaFieldError(key, types, type(value), value))
+    return errors
+
+
 class MetaVerification:
     def __init__(self, *errors: Union[MetaFieldError, "MetaVerification"]):
         self.error = errors
@@ -39,44 +115,16 @@ class MetaVerification:
         """
         Check that meta have the same types as specification
         """
+        return MetaVerification(*_check(meta, compile_specification(specification)))
 
-        if is_dataclass(specification):
-            spec_keys = specification.__dataclass_fields__.keys()
-            spec_dc = {k: specification.__dataclass_fields__[
-                k].type for k in spec_keys}
-        else:
-            spec_keys = dict([specification]).keys(
-            ) if specification is not None else []
-            spec_dc = dict(
-                [specification]) if specification is not None else {}
-
-        if is_dataclass(meta):
-            meta_keys = meta.__dataclass_fields__.keys()
-        else:
-            meta_keys = meta.keys()
-
-        errors: list[Union[MetaFieldError, "MetaVerification"]] = []
-        for spec_key in spec_keys:
-            if isinstance(spec_key, tuple):
-                errors += MetaVerification.verify(meta, spec_key).error
-            else:
-                if spec_key not in meta_keys:
-                    errors.append(
-                        MetaFieldError(spec_key,
-                                       spec_dc[spec_key]
-                                       )
-                    )
-                elif issubclass(type(get_meta_attr(meta, spec_key)), spec_dc[spec_key]):
-                    pass
-                else:
-                    errors.append(
-                        MetaFieldError(spec_key,
-                                       spec_dc[spec_key],
-                                       get_meta_attr(meta, spec_key),
-                                       type(get_meta_attr(meta, spec_key))
-                                       )
-                    )
-        return MetaVerification(*errors)
+    @staticmethod
+    def verify_many(metas: Iterable[Meta],
+                    specification: Optional[Specification] = None) -> list["MetaVerification"]:
+        """
+        Check every meta by the same specification, it is compiled once
+        """
+        validator = compile_specification(specification)
+        return [MetaVerification(*_check(meta, validator)) for meta in metas]
 
 
 def get_meta_attr(meta: Meta, key: str, default: Optional[Any] = None) -> Optional[Any]:
@@ -96,6 +144,44 @@ def get_meta_attr(meta: Meta, key: str, default: Optional[Any] = None) -> Option
         return default
 
 
+class IdentityKey(NamedTuple):
+    """
+    Key of unhashable value which has no content key, it is equal only to key of the same object
+    """
+    type: str
+    id: int
+
+
+def _array_key(array: Any) -> tuple:
+    """
+    Key NumPy array by dtype, shape and hash of its bytes
+    """
+    digest = hashlib.blake2b(array.tobytes(), digest_size=16).hexdigest()
+    return "ndarray", str(array.dtype), array.shape, digest
+
+
+def meta_key(meta: Any) -> Any:
+    """
+    Return hashable canonical form of meta, equal metas have equal keys.
+    NumPy arrays are keyed by content, other unhashable values by identity
+    """
+    if is_dataclass(meta) and not isinstance(meta, type):
+        return type(meta).__qualname__, meta_key(meta.__dict__)
+    if isinstance(meta, dict):
+        return tuple(sorted(((str(k), meta_key(v)) for k, v in meta.items()), key=lambda x: x[0]))
+    if isinstance(meta, (list, tuple)):
+        return tuple(meta_key(v) for v in meta)
+    if isinstance(meta, (set, frozenset)):
+        return frozenset(meta_key(v) for v in meta)
+    if type(meta).__module__ == "numpy" and type(meta).__name__ == "ndarray" and not meta.dtype.hasobject:
+        return _array_key(meta)
+    try:
+        hash(meta)
+    except TypeError:
+        return IdentityKey(type(meta).__qualname__, id(meta))
+    return type(meta).__name__, meta
+
+
 def update_meta(meta: Meta, **kwargs):
     """
     Update meta from kwargs
@@ -0,0 +1,276 @@
+"""
+Codecs of Envelope meta registered by 2-byte meta type of Envelope header
+"""
+import json
+import struct
+from abc import ABC, abstractmethod
+from dataclasses import is_dataclass, fields
+from json import JSONEncoder
+from typing import Any
+
+from stem.meta import Meta
+
+
+class MetaEncoder(JSONEncoder):
+    def default(self, obj: Meta) -> Any:
+        if is_dataclass(obj):
+            return obj.__dict__
+        else:
+            return json.JSONEncoder.default(self, obj)
+
+
+class MetaCodec(ABC):
+    """
+    Encodes meta to bytes and decodes it back from buffer
+    """
+
+    @abstractmethod
+    def encode(self, meta: Meta) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, buffer: memoryview) -> Meta:
+        pass
+
+
+class JsonCodec(MetaCodec):
+
+    def encode(self, meta: Meta) -> bytes:
+        return json.dumps(meta, cls=MetaEncoder).encode()
+
+    def decode(self, buffer: memoryview) -> Meta:
+        return json.loads(str(buffer, "utf-8"))
+
+
+_NONE, _TRUE, _FALSE, _INT8, _INT, _BIG_INT, _FLOAT = b"NTFbiIf"
+_SHORT_STR, _STR, _BYTES, _SHORT_LIST, _LIST, _INTS, _FLOATS, _STRS, _SHORT_DICT, _DICT = b"sSyalqdLDm"
+_INT_CODES = [(-2 ** 7, 2 ** 7, b"b"), (-2 ** 15, 2 ** 15, b"h"), (-2 ** 31, 2 ** 31, b"i"), (-2 ** 63, 2 ** 63, b"q")]
+_INT_SIZES = {code: struct.calcsize(">" + chr(code)) for code in b"bhiq"}
+_TAG_BYTE = struct.Struct(">BB")
+_TAG_INT8 = struct.Struct(">Bb")
+_TAG_INT64 = struct.Struct(">Bq")
+_TAG_FLOAT64 = struct.Struct(">Bd")
+_TAG_LENGTH = struct.Struct(">BI")
+_TAG_LENGTH_CODE = struct.Struct(">BIc")
+_INT8_VALUE = struct.Struct(">b")
+_INT64 = struct.Struct(">q")
+_FLOAT64 = struct.Struct(">d")
+_LENGTH = struct.Struct(">I")
+_MIN_INT, _MAX_INT = -2 ** 63, 2 ** 63
+
+
+def _encode(value: Any, out: bytearray):
+    kind = type(value)
+    if kind is str:
+        data = value.encode()
+        size = len(data)
+        out += _TAG_BYTE.pack(_SHORT_STR, size) if size < 256 else _TAG_LENGTH.pack(_STR, size)
+        out += data
+    elif kind is int:
+        if -128 <= value < 128:
+            out += _TAG_INT8.pack(_INT8, value)
+        elif _MIN_INT <= value < _MAX_INT:
+            out += _TAG_INT64.pack(_INT, value)
+        else:
+            data = str(value).encode()
+            out += _TAG_LENGTH.pack(_BIG_INT, len(data))
+            out += data
+    elif kind is dict:
+        _encode_dict(value.items(), len(value), out)
+    elif kind is float:
+        out += _TAG_FLOAT64.pack(_FLOAT, value)
+    elif kind is list or kind is tuple:
+        _encode_list(value, out)
+    elif value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, dict):
+        _encode_dict(value.items(), len(value), out)
+    elif is_dataclass(value):
+        _encode_dict([(f.name, getattr(value, f.name)) for f in fields(value)], len(fields(value)), out)
+    elif isinstance(value, (list, tuple)):
+        _encode_list(value, out)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        out += _TAG_LENGTH.pack(_BYTES, len(data))
+        out += data
+    elif isinstance(value, int):
+        _encode(int(value), out)
+    elif isinstance(value, float):
+        _encode(float(value), out)
+    elif isinstance(value, str):
+        _encode(str(value), out)
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} is not supported by BinaryCodec")
+
+
+def _encode_dict(items: Any, length: int, out: bytearray):
+    out += _TAG_BYTE.pack(_SHORT_DICT, length) if length < 256 else _TAG_LENGTH.pack(_DICT, length)
+    for key, item in items:
+        if type(key) is str:
+            data = key.encode()
+            if len(data) < 256:
+                out += _TAG_BYTE.pack(_SHORT_STR, len(data))
+                out += data
+            else:
+                _encode(key, out)
+        else:
+            _encode(key, out)
+        _encode(item, out)
+
+
+def _encode_list(value: Any, out: bytearray):
+    length = len(value)
+    kinds = set(map(type, value))
+    if kinds == {str}:
+        lengths = list(map(len, value))
+        data = "".join(value).encode()
+        if len(data) != sum(lengths):
+            lengths = [len(item.encode()) for item in value]
+        if max(lengths) < 256:
+            out += _TAG_LENGTH_CODE.pack(_STRS, length, b"B")
+            out += bytes(lengths)
+        else:
+            out += _TAG_LENGTH_CODE.pack(_STRS, length, b"I")
+            out += struct.pack(f">{length}I", *lengths)
+        out += data
+        return
+    if kinds == {int}:
+        low, high = min(value), max(value)
+        for min_value, max_value, code in _INT_CODES:
+            if min_value <= low and high < max_value:
+                out += _TAG_LENGTH_CODE.pack(_INTS, length, code)
+                out += struct.pack(f">{length}{code.decode()}", *value)
+                return
+    elif kinds == {float}:
+        out += _TAG_LENGTH.pack(_FLOATS, length)
+        out += struct.pack(f">{length}d", *value)
+        return
+    out += _TAG_BYTE.pack(_SHORT_LIST, length) if length < 256 else _TAG_LENGTH.pack(_LIST, length)
+    for item in value:
+        _encode(item, out)
+
+
+def _decode(data: bytes, offset: int) -> tuple[Any, int]:
+    tag = data[offset]
+    if tag == _SHORT_STR:
+        end = offset + 2 + data[offset + 1]
+        return data[offset + 2:end].decode(), end
+    if tag == _INT8:
+        return _INT8_VALUE.unpack_from(data, offset + 1)[0], offset + 2
+    if tag == _SHORT_DICT:
+        return _decode_dict(data, offset + 2, data[offset + 1])
+    if tag == _INT:
+        return _INT64.unpack_from(data, offset + 1)[0], offset + 9
+    if tag == _FLOAT:
+        return _FLOAT64.unpack_from(data, offset + 1)[0], offset + 9
+    if tag == _NONE:
+        return None, offset + 1
+    if tag == _TRUE:
+        return True, offset + 1
+    if tag == _FALSE:
+        return False, offset + 1
+    if tag == _SHORT_LIST:
+        return _decode_list(data, offset + 2, data[offset + 1])
+    length, = _LENGTH.unpack_from(data, offset + 1)
+    offset += 1 + _LENGTH.size
+    if tag == _STRS:
+        return _decode_strs(data, offset, length)
+    if tag == _INTS:
+        code = data[offset]
+        offset += 1
+        return list(struct.unpack_from(f">{length}{chr(code)}", data, offset)), offset + _INT_SIZES[code] * length
+    if tag == _FLOATS:
+        return list(struct.unpack_from(f">{length}d", data, offset)), offset + 8 * length
+    if tag == _DICT:
+        return _decode_dict(data, offset, length)
+    if tag == _LIST:
+        return _decode_list(data, offset, length)
+    if tag == _STR:
+        return data[offset:offset + length].decode(), offset + length
+    if tag == _BYTES:
+        return data[offset:offset + length], offset + length
+    if tag == _BIG_INT:
+        return int(data[offset:offset + length]), offset + length
+    raise ValueError(f"Unknown tag {tag!r} in binary meta")
+
+
+def _decode_dict(data: bytes, offset: int, length: int) -> tuple[dict, int]:
+    items = {}
+    for _ in range(length):
+        if data[offset] == _SHORT_STR:
+            end = offset + 2 + data[offset + 1]
+            key = data[offset + 2:end].decode()
+            offset = end
+        else:
+            key, offset = _decode(data, offset)
+        items[key], offset = _decode(data, offset)
+    return items, offset
+
+
+def _decode_list(data: bytes, offset: int, length: int) -> tuple[list, int]:
+    items = []
+    for _ in range(length):
+        item, offset = _decode(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _decode_strs(data: bytes, offset: int, length: int) -> tuple[list[str], int]:
+    code = data[offset]
+    offset += 1
+    if code == ord("B"):
+        lengths = data[offset:offset + length]
+        offset += length
+    else:
+        lengths = struct.unpack_from(f">{length}I", data, offset)
+        offset += 4 * length
+    items = []
+    for size in lengths:
+        end = offset + size
+        items.append(data[offset:end].decode())
+        offset = end
+    return items, offset
+
+
+class BinaryCodec(MetaCodec):
+    """
+    Compact tagged encoding of None, bool, int, float, str, bytes, lists, tuples, dicts and dataclasses.
+    Lists of only ints, floats or strs are packed by one struct call, short strings, containers and small ints
+    take less space. Tuples are decoded as lists and dataclasses as dicts like in JSON
+    """
+
+    def encode(self, meta: Meta) -> bytes:
+        out = bytearray()
+        _encode(meta, out)
+        return bytes(out)
+
+    def decode(self, buffer: memoryview) -> Meta:
+        value, _ = _decode(bytes(buffer), 0)
+        return value
+
+
+JSON = b"DI"
+BINARY = b"BI"
+
+_codecs: dict[bytes, MetaCodec] = {}
+
+
+def register_codec(meta_type: bytes, codec: MetaCodec):
+    if len(meta_type) != 2:
+        raise ValueError("Meta type must be 2 bytes")
+    _codecs[meta_type] = codec
+
+
+def get_codec(meta_type: bytes) -> MetaCodec:
+    try:
+        return _codecs[meta_type]
+    except KeyError:
+        raise ValueError(f"Unknown meta type {meta_type!r}") from None
+
+
+register_codec(JSON, JsonCodec())
+register_codec(BINARY, BinaryCodec())
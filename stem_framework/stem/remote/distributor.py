@@ -12,10 +12,8 @@ async def get_server(servers: list[tuple[str, int]]) -> tuple[str, int]:
     powerfullities = []
     for host, port in servers:
         reader_new, writer_new = await asyncio.open_connection(host, port)
-        writer_new.write(Envelope(dict(command="powerfullity")).to_bytes())
-        await writer_new.drain()
-        response = await reader_new.read()
-        envelope = Envelope.from_bytes(response)
+        await Envelope(dict(command="powerfullity")).async_write_to(writer_new)
+        envelope = await Envelope.async_read(reader_new)
         powerfullities.append([host, port, envelope.meta["powerfullity"]])
         writer_new.close()
         await writer_new.wait_closed()
@@ -25,12 +23,10 @@ async def get_server(servers: list[tuple[str, int]]) -> tuple[str, int]:
 
 async def send_message(envelop: Envelope, server: tuple[str, int]) -> Envelope:
     reader_new, writer_new = await asyncio.open_connection(server[0], server[1])
-    writer_new.write(envelop.to_bytes())
-    await writer_new.drain()
-    response = await reader_new.read()
+    await envelop.async_write_to(writer_new)
+    envelope = await Envelope.async_read(reader_new)
     writer_new.close()
     await writer_new.wait_closed()
-    envelope = Envelope.from_bytes(response)
     return envelope
 
 
@@ -44,13 +40,12 @@ class Distributor:
         try:
             envelop_data = await Envelope.async_read(reader)
         except:
-            writer.write(
-                Envelope({'status': 'failed', 'error': 'Not Envelop format'}).to_bytes())
-            await writer.drain()
+            await Envelope({'status': 'failed', 'error': 'Not Envelop format'}).async_write_to(writer)
             sys.exit('Not Envelop format')
 
         meta = envelop_data.meta
         data = envelop_data.data
+        meta_type = envelop_data.meta_type
         if 'command' in meta:
             match meta['command']:
                 case 'run':
@@ -63,25 +58,25 @@ class Distributor:
                         )
 
                         task_result = envelope.meta['task_result']
-                        writer.write(
-                            Envelope({"status": "success", 'task_result': task_result}).to_bytes())
+                        await Envelope({"status": "success", 'task_result': task_result},
+                                       meta_type=meta_type).async_write_to(writer)
                 case 'structure':
                     Distributor.server = await get_server(self.servers)
                     envelope = await send_message(Envelope(dict(command="structure")), Distributor.server)
 
                     dc = envelope.meta['structure']
                     dc['status'] = 'success'
-                    writer.write(Envelope(dc).to_bytes())
+                    await Envelope(dc, meta_type=meta_type).async_write_to(writer)
                 case 'powerfullity':
                     sm = 0
                     for server in self.servers:
                         envelope = await send_message(Envelope(dict(command="powerfullity")), (server[0], server[1]))
                         sm += envelope.meta["powerfullity"]
-                    writer.write(
-                        Envelope({"status": "success", 'powerfullity': sm}).to_bytes())
+                    await Envelope({"status": "success", 'powerfullity': sm},
+                                   meta_type=meta_type).async_write_to(writer)
         else:
-            writer.write(
-                Envelope({'status': 'failed', 'error': 'KeyError: command'}).to_bytes())
+            await Envelope({'status': 'failed', 'error': 'KeyError: command'},
+                           meta_type=meta_type).async_write_to(writer)
 
         await writer.drain()
         writer.close()
@@ -36,5 +36,5 @@ class RemoteWorkspace(IWorkspace):
         return {t: RemoteTask(self.address, self.port, t) for t in self.workspace.tasks}
 
     @property
-    def workspaces(self) -> set["IWorkspace"]:
-        return set([RemoteWorkspace(w, self.address, self.port) for w in self.workspaces])
+    def workspaces(self) -> list["IWorkspace"]:
+        return [RemoteWorkspace(w, self.address, self.port) for w in self.workspace.workspaces]
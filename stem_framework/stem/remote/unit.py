@@ -2,6 +2,7 @@ import socketserver
 import types
 from socketserver import StreamRequestHandler
 from typing import Optional, TypeVar
+from stem.cache import Cache
 from stem.envelope import Envelope
 from stem.meta import Meta
 from stem.remote.remote_workspace import RemoteTask
@@ -14,8 +15,7 @@ T = TypeVar("T")
 
 
 def get_task_result(meta: Meta, data: tuple, task_remote: RemoteTask) -> list[T]:
-    meta['workspace'] = UnitHandler.workspace
-    meta['task_master'] = UnitHandler.task_master
+    meta = dict(meta, workspace=UnitHandler.workspace, task_master=UnitHandler.task_master)
     task_result_raw = task_remote.transform(meta).data
     task_result = []
     if isinstance(task_result_raw, types.GeneratorType):
@@ -36,6 +36,7 @@ class UnitHandler(StreamRequestHandler):
     def handle(self):
         envelop_data = Envelope.read(self.rfile)
         meta = envelop_data.meta
+        meta_type = envelop_data.meta_type
         data = tuple(envelop_data.data)
         if 'command' in meta:
             match meta['command']:
@@ -46,33 +47,39 @@ class UnitHandler(StreamRequestHandler):
                         task_remote = RemoteTask(self.request.getsockname()[0], self.request.getsockname()[1],
                                                  task.name)
                         task_result = get_task_result(meta, data, task_remote)
-                        Envelope({"status": "success", "task_result": task_result}).write_to(
+                        Envelope({"status": "success", "task_result": task_result}, meta_type=meta_type).write_to(
                             self.wfile)
                 case 'structure':
                     dc = UnitHandler.workspace.structure()
                     dc["status"] = "success"
-                    Envelope(dc).write_to(self.wfile)
+                    Envelope(dc, meta_type=meta_type).write_to(self.wfile)
                 case 'powerfullity':
-                    Envelope({"status": "success", 'powerfullity': UnitHandler.powerfullity}).write_to(
+                    Envelope({"status": "success", 'powerfullity': UnitHandler.powerfullity},
+                             meta_type=meta_type).write_to(
                         self.wfile)
                 case 'stop':
                     self.server.shutdown()
                     self.server.server_close()
         else:
-            Envelope({'status': 'failed', 'error': 'KeyError: command'}).write_to(
+            Envelope({'status': 'failed', 'error': 'KeyError: command'}, meta_type=meta_type).write_to(
                 self.wfile)
 
 
-def start_unit(workspace: IWorkspace, host: str, port: int, powerfullity: Optional[int] = None):
+def start_unit(workspace: IWorkspace, host: str, port: int, powerfullity: Optional[int] = None,
+               cache: Optional[Cache] = None):
+    """
+    Serve tasks of workspace, results are cached between requests only if cache is given
+    """
     UnitHandler.powerfullity = powerfullity
     UnitHandler.workspace = workspace
+    UnitHandler.task_master = TaskMaster(SimpleRunner(cache=cache))
     with socketserver.TCPServer((host, port), UnitHandler) as server:
         server.serve_forever()
 
 
 def start_unit_in_subprocess(workspace: IWorkspace, host: str, port: int,
-                             powerfullity: Optional[int] = None) -> Process:
+                             powerfullity: Optional[int] = None, cache: Optional[Cache] = None) -> Process:
     my_thread = Process(target=start_unit, args=(
-        workspace, host, port, powerfullity), daemon=True)
+        workspace, host, port, powerfullity, cache), daemon=True)
     my_thread.start()
     return my_thread
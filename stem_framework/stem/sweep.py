@@ -0,0 +1,208 @@
+"""
+Parameter sweeps: evaluation of one task over grid or random sample of meta values in worker processes
+"""
+import copy
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, Sequence, Union
+
+from stem.meta import Meta, get_meta_attr, update_meta
+from stem.task import Task
+from stem.task_runner import SimpleRunner, TaskAddress, task_address, find_node_by_address
+from stem.task_tree import TaskNode
+from stem.workspace import IWorkspace
+
+
+def set_meta_path(meta: Meta, path: str, value: Any) -> Meta:
+    """
+    Set value in nested meta by dotted path like "int_range.stop", missing levels are created as dicts
+    """
+    *parents, key = path.split(".")
+    level = meta
+    for name in parents:
+        sub = get_meta_attr(level, name)
+        if sub is None:
+            sub = {}
+            update_meta(level, **{name: sub})
+        level = sub
+    update_meta(level, **{key: value})
+    return meta
+
+
+class Grid:
+    """
+    Cartesian product of values of meta keys, points are ordered as numpy.ndindex of shape.
+    Keys are dotted paths in meta, "__" in keyword names is the same as "."
+    """
+
+    def __init__(self, **axes: Sequence):
+        self.axes = {key.replace("__", "."): list(values) for key, values in axes.items()}
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(len(values) for values in self.axes.values())
+
+    def __len__(self) -> int:
+        size = 1
+        for n in self.shape:
+            size *= n
+        return size
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        keys = list(self.axes)
+        for values in itertools.product(*self.axes.values()):
+            yield dict(zip(keys, values))
+
+    def coordinates(self) -> dict[str, "numpy.ndarray"]:
+        import numpy as np
+
+        return {key: np.asarray(values) for key, values in self.axes.items()}
+
+
+class RandomSample:
+    """
+    Random points where every meta key is drawn from sequence of values
+    or by callable which takes numpy.random.Generator
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = None, **axes: Union[Sequence, Callable]):
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        self.size = size
+        self.axes = {}
+        for key, values in axes.items():
+            key = key.replace("__", ".")
+            if callable(values):
+                self.axes[key] = [values(rng) for _ in range(size)]
+            else:
+                values = list(values)
+                self.axes[key] = [values[i] for i in rng.integers(len(values), size=size)]
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.size,
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        keys = list(self.axes)
+        for values in zip(*self.axes.values()):
+            yield dict(zip(keys, values))
+
+    def coordinates(self) -> dict[str, "numpy.ndarray"]:
+        import numpy as np
+
+        return {key: np.asarray(values) for key, values in self.axes.items()}
+
+
+Space = Union[Grid, RandomSample]
+
+
+@dataclass
+class SweepResult:
+    shape: tuple[int, ...]
+    coordinates: dict[str, "numpy.ndarray"]
+    values: "numpy.ndarray"
+    errors: dict[int, Exception] = field(default_factory=dict)
+
+    def to_hdf5(self, path: str, name: str = "sweep"):
+        """
+        Save values and coordinates to group name of HDF5 file, requires h5py
+        """
+        try:
+            import h5py
+        except ImportError as e:
+            raise ImportError("h5py is required to save sweep result to HDF5") from e
+
+        with h5py.File(path, "a") as hdf_obj:
+            group = hdf_obj.require_group(name)
+            group.create_dataset("values", data=self.values)
+            coordinates = group.require_group("coordinates")
+            for key, values in self.coordinates.items():
+                coordinates.create_dataset(key, data=values)
+            group.attrs["errors"] = sorted(self.errors)
+
+
+def _run_shard(address: TaskAddress, metas: list[Meta]) -> list[tuple[int, Any, Optional[Exception]]]:
+    node = find_node_by_address(address)
+    return _evaluate_shard(node, metas)
+
+
+def _evaluate_shard(node: TaskNode, metas: list[Meta]) -> list[tuple[int, Any, Optional[Exception]]]:
+    results = []
+    for index, future in SimpleRunner().run_many(metas, node):
+        if future.exception() is not None:
+            results.append((index, None, future.exception()))
+        else:
+            results.append((index, future.result(), None))
+    return results
+
+
+class Sweep:
+    """
+    Evaluates task for every point of space, points are split into shards which are run by worker processes.
+    Task is found in workers by its workspace like in ProcessingRunner,
+    tasks which workspace can't be imported are evaluated in current process.
+    Failed points are NaN in values and their errors are kept by flat index
+    """
+    MAX_WORKERS = os.cpu_count()
+    SHARD_SIZE = 64
+
+    def __init__(self, task: Task, space: Space, meta: Optional[Meta] = None,
+                 workspace: Optional[IWorkspace] = None,
+                 max_workers: Optional[int] = None, shard_size: Optional[int] = None):
+        self.task = task
+        self.space = space
+        self.meta = meta if meta is not None else {}
+        self.workspace = workspace
+        self.max_workers = max_workers or Sweep.MAX_WORKERS
+        self.shard_size = shard_size or Sweep.SHARD_SIZE
+
+    def metas(self) -> list[Meta]:
+        return [self._point_meta(point) for point in self.space]
+
+    def _point_meta(self, point: dict[str, Any]) -> Meta:
+        meta = copy.deepcopy(self.meta)
+        for path, value in point.items():
+            set_meta_path(meta, path, value)
+        return meta
+
+    def run(self) -> SweepResult:
+        import numpy as np
+
+        metas = self.metas()
+        node = TaskNode(self.task, self.workspace)
+        address = task_address(node)
+        shards = [(start, metas[start:start + self.shard_size]) for start in range(0, len(metas), self.shard_size)]
+
+        values: list[Any] = [np.nan] * len(metas)
+        errors: dict[int, Exception] = {}
+
+        def collect(start: int, results: list[tuple[int, Any, Optional[Exception]]]):
+            for index, value, error in results:
+                if error is None:
+                    values[start + index] = value
+                else:
+                    errors[start + index] = error
+
+        if address is None or len(shards) <= 1:
+            for start, shard in shards:
+                collect(start, _evaluate_shard(node, shard))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures: dict[Future, int] = {executor.submit(_run_shard, address, shard): start
+                                              for start, shard in shards}
+                for future, start in futures.items():
+                    collect(start, future.result())
+
+        try:
+            array = np.asarray(values, dtype=float if errors else None)
+        except (TypeError, ValueError):
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+        return SweepResult(shape=self.space.shape, coordinates=self.space.coordinates(),
+                           values=array.reshape(self.space.shape), errors=errors)
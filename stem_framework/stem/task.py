@@ -1,8 +1,9 @@
+import inspect
 from functools import reduce
-from typing import TypeVar, Union, Tuple, Callable, Optional, Generic, Any, Iterator
+from typing import TypeVar, Union, Tuple, Callable, Optional, Generic, Any, Iterator, Iterable
 
 from abc import ABC, abstractmethod
-from stem.core import Named
+from stem.core import Named, register_definition
 from stem.meta import Specification, Meta
 
 T = TypeVar("T")
@@ -13,9 +14,21 @@ class Task(ABC, Generic[T], Named):
     specification: Optional[Specification] = None
     settings: Optional[Meta] = None
 
+    def __new__(cls, *args, **kwargs):
+        task = super().__new__(cls)
+        register_definition(task, "task")
+        return task
+
     def check_by_meta(self, meta: Meta):
         pass
 
+    @property
+    def is_async(self) -> bool:
+        """
+        True if transform returns awaitable
+        """
+        return inspect.iscoroutinefunction(self.transform)
+
     @abstractmethod
     def transform(self, meta: Meta, /, **kwargs: Any) -> T:
         pass
@@ -34,6 +47,10 @@ class FunctionTask(Task[T]):
     def __call__(self, *args, **kwargs):
         return self._func(*args, **kwargs)
 
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self._func)
+
     def transform(self, meta: Meta, /, **kwargs: Any) -> T:
         try:
             return self._func(meta, **kwargs)
@@ -44,6 +61,10 @@ class FunctionTask(Task[T]):
 class DataTask(Task[T]):
     dependencies = ()
 
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self.data)
+
     @abstractmethod
     def data(self, meta: Meta) -> T:
         pass
@@ -64,6 +85,10 @@ class FunctionDataTask(DataTask[T]):
     def __call__(self, *args, **kwargs):
         return self._func(*args, **kwargs)
 
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self._func)
+
     def data(self, meta: Meta) -> T:
         try:
             return self._func(meta)
@@ -88,38 +113,98 @@ def task(func: Callable[[Meta, ...], T], specification: Optional[Specification]
                             specification,
                             **settings)
 
-    FunctionTask.__module__ = func.__module__
-    return do()
+    ft = do()
+    ft.__module__ = func.__module__
+    return ft
+
+
+BATCH_SIZE = 4096
+
+
+def batches(source: Iterable, batch_size: int = BATCH_SIZE) -> Iterator["numpy.ndarray"]:
+    """
+    Split source into NumPy arrays of batch_size items, arrays which come from source are passed as is
+    """
+    import numpy as np
+
+    if isinstance(source, np.ndarray):
+        for i in range(0, len(source), batch_size):
+            yield source[i:i + batch_size]
+        return
+    buffer = []
+    for item in source:
+        if isinstance(item, np.ndarray):
+            if buffer:
+                yield np.asarray(buffer)
+                buffer = []
+            yield item
+        else:
+            buffer.append(item)
+            if len(buffer) == batch_size:
+                yield np.asarray(buffer)
+                buffer = []
+    if buffer:
+        yield np.asarray(buffer)
 
 
 class MapTask(Task[Iterator[T]]):
-    def __init__(self, func: Callable, dependence: Union[str, "Task"]):
+    """
+    Applies func to every item of dependence.
+    Vectorized func is called once per NumPy batch and the task yields batches
+    """
+
+    def __init__(self, func: Callable, dependence: Union[str, "Task"],
+                 vectorized: bool = False, batch_size: int = BATCH_SIZE):
         self._name = "map_" + dependence.name
         self._func = func
         self.dependencies = dependence
+        self.vectorized = vectorized
+        self.batch_size = batch_size
 
     def transform(self, meta: Meta, /, **kwargs: Any) -> T:
         dp = self.dependencies if isinstance(self.dependencies, str) else self.dependencies.name
+        if self.vectorized:
+            return map(self._func, batches(kwargs[dp], self.batch_size))
         return map(self._func, kwargs[dp])
 
 
 class FilterTask(Task[Iterator[T]]):
-    def __init__(self, func: Callable, dependence: Union[str, "Task"]):
+    """
+    Keeps items of dependence for which func is true.
+    Vectorized func is called once per NumPy batch, returns boolean mask and the task yields batches
+    """
+
+    def __init__(self, func: Callable, dependence: Union[str, "Task"],
+                 vectorized: bool = False, batch_size: int = BATCH_SIZE):
         self._name = "filter_" + dependence.name
         self._func = func
         self.dependencies = dependence
+        self.vectorized = vectorized
+        self.batch_size = batch_size
 
     def transform(self, meta: Meta, /, **kwargs: Any) -> T:
         dp = self.dependencies if isinstance(self.dependencies, str) else self.dependencies.name
+        if self.vectorized:
+            return (batch[self._func(batch)] for batch in batches(kwargs[dp], self.batch_size))
         return filter(self._func, kwargs[dp])
 
 
 class ReduceTask(Task[Iterator[T]]):
-    def __init__(self, func: Callable, dependence: Union[str, "Task"]):
+    """
+    Reduces items of dependence by func.
+    Vectorized func is NumPy ufunc, its reduce is called once per batch and partial results are combined by func
+    """
+
+    def __init__(self, func: Callable, dependence: Union[str, "Task"],
+                 vectorized: bool = False, batch_size: int = BATCH_SIZE):
         self._name = "reduce_" + dependence.name
         self._func = func
         self.dependencies = dependence
+        self.vectorized = vectorized
+        self.batch_size = batch_size
 
     def transform(self, meta: Meta, /, **kwargs: Any) -> T:
         dp = self.dependencies if isinstance(self.dependencies, str) else self.dependencies.name
-        return reduce(self._func, kwargs[dp])
\ No newline at end of file
+        if self.vectorized:
+            return reduce(self._func, (self._func.reduce(batch) for batch in batches(kwargs[dp], self.batch_size)))
+        return reduce(self._func, kwargs[dp])
@@ -1,5 +1,6 @@
 import asyncio
 from enum import Enum, auto
+from collections.abc import Iterator
 from typing import Optional, Callable, TypeVar, Generic
 from functools import cached_property
 from dataclasses import dataclass, field
@@ -7,6 +8,7 @@ from dataclasses import dataclass, field
 from stem.meta import Meta, MetaVerification, Specification
 from stem.task import Task
 from stem.workspace import Workspace
+from stem.cost import CostModel, Estimate, estimate
 from stem.task_runner import TaskRunner, SimpleRunner
 from stem.task_tree import TaskNode, TaskTree
 
@@ -47,6 +49,7 @@ class TaskResult(Generic[T]):
     task_node: TaskNode[T]
     meta_errors: Optional[TaskMetaError] = None
     lazy_data: Callable[[], T] = lambda: None
+    meta: Optional[Meta] = None
 
     @cached_property
     def data(self) -> Optional[T]:
@@ -63,11 +66,13 @@ class TaskMaster:
         self.task_runner = task_runner
         self.task_tree = task_tree
 
-    def execute(self, meta: Meta, task: Task[T], workspace: Optional[Workspace] = None) -> TaskResult[T]:
+    def _resolve_node(self, task: Task[T], workspace: Optional[Workspace] = None) -> TaskNode[T]:
         if self.task_tree is None:
-            node = TaskNode(task, workspace)
-        else:
-            node = self.task_tree.resolve_node(task, workspace)
+            return TaskNode(task, workspace)
+        return self.task_tree.resolve_node(task, workspace)
+
+    def execute(self, meta: Meta, task: Task[T], workspace: Optional[Workspace] = None) -> TaskResult[T]:
+        node = self._resolve_node(task, workspace)
         if node.has_dependence_errors:
             return TaskResult(task_node=node, status=TaskStatus.DEPENDENCIES_ERROR)
 
@@ -82,3 +87,37 @@ class TaskMaster:
                               self.task_runner.run(meta, node))
                           if asyncio.iscoroutinefunction(self.task_runner.run)
                           else self.task_runner.run(meta, node))
+
+    def estimate(self, meta: Meta, task: Task[T], workspace: Optional[Workspace] = None,
+                 cost_model: Optional[CostModel] = None) -> Estimate:
+        """
+        Estimate total work and critical path of task by cost model of runner or given one
+        """
+        cost_model = cost_model or self.task_runner.cost_model or CostModel()
+        return estimate(meta, self._resolve_node(task, workspace), cost_model)
+
+    def execute_many(self, metas: list[Meta], task: Task[T],
+                     workspace: Optional[Workspace] = None) -> Iterator[TaskResult[T]]:
+        """
+        Execute task for every meta in one run, shared dependencies are evaluated once.
+        Results are yielded as soon as they are ready, not in order of metas
+        """
+        node = self._resolve_node(task, workspace)
+        if node.has_dependence_errors:
+            for meta in metas:
+                yield TaskResult(task_node=node, status=TaskStatus.DEPENDENCIES_ERROR, meta=meta)
+            return
+
+        valid = list(metas)
+        if task.specification is not None:
+            valid = []
+            for meta, meta_verify in zip(metas, MetaVerification.verify_many(metas, task.specification)):
+                if meta_verify.checked_success:
+                    valid.append(meta)
+                else:
+                    yield TaskResult(task_node=node, status=TaskStatus.META_ERROR, meta=meta,
+                                     meta_errors=TaskMetaError(task_node=node, meta_error=meta_verify))
+
+        for index, future in self.task_runner.run_many(valid, node):
+            status = TaskStatus.CONTAINS_DATA if future.exception() is None else TaskStatus.INVOCATION_ERROR
+            yield TaskResult(task_node=node, status=status, meta=valid[index], lazy_data=future.result)
@@ -1,65 +1,860 @@
+import asyncio
+import heapq
+import inspect
 import os
-from concurrent.futures import ThreadPoolExecutor
-from multiprocessing.pool import ThreadPool as Pool
-from typing import Generic, TypeVar
+import sys
+import time
+from collections import deque
+from contextlib import closing
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from functools import partial
+from importlib import import_module
+from multiprocessing import Manager
+from multiprocessing.managers import SyncManager
+from itertools import chain, islice
+from queue import Queue, Empty, Full
+from threading import Event, Lock, Semaphore
+from typing import Generic, TypeVar, Optional, Any, Callable, Iterable
 from abc import ABC, abstractmethod
 
-from stem.meta import Meta, get_meta_attr
+from stem.broadcast import Broadcast
+from stem.cache import Cache, result_key
+from stem.cost import CostModel
+from stem.memory import MemoryMonitor, Spilled
+from stem.meta import Meta, get_meta_attr, meta_key
+from stem.task import Task
 from stem.task_tree import TaskNode
+from stem.trace import Tracer, TraceEvent
+from stem.workspace import IWorkspace
 
 T = TypeVar("T")
 
 
+class _Job:
+    """
+    Single evaluation of task node with its own meta
+    """
+
+    def __init__(self, node: TaskNode, meta: Meta, cache: Optional[Cache] = None,
+                 memory: Optional[MemoryMonitor] = None):
+        self.node = node
+        self.meta = meta
+        self.cache = cache
+        self.memory = memory
+        self.key: Optional[str] = None
+        self.done = False
+        self.dependencies: list["_Job"] = []
+        self.dependants: list["_Job"] = []
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self._shares: Optional[list[Iterator]] = None
+        self._consumers: Optional[int] = None
+        self._lock = Lock()
+
+    @property
+    def name(self) -> str:
+        return self.node.task.name
+
+    @property
+    def workspace_name(self) -> Optional[str]:
+        return getattr(self.node.workspace, "name", None)
+
+    def set_result(self, result: Any):
+        """
+        Save result, iterator consumed by several dependants is broadcast to each of them
+        """
+        if self.memory is not None and self.dependants:
+            result = self.memory.hold(self, self.name, result)
+        self.result = result
+        self.done = True
+        if isinstance(result, Iterator) and len(self.dependants) > 1:
+            self._shares = Broadcast(result, len(self.dependants)).consumers
+
+    def finish(self, result: Any):
+        """
+        Save result of evaluation, it is put into cache if job has one.
+        Results of dependencies are released when this job is their last dependant
+        """
+        if self.cache is not None and self.key is not None:
+            result = self.cache.put(self.key, result)
+        self.set_result(result)
+        self._consume()
+
+    def fail(self, error: Exception):
+        self.error = error
+        self.done = True
+        self._consume()
+
+    def _consume(self):
+        """
+        Release results of dependencies for which this job is the last dependant
+        """
+        for dep in self.dependencies:
+            dep._consumed()
+
+    def _consumed(self):
+        with self._lock:
+            if self._consumers is None:
+                self._consumers = len(self.dependants)
+            self._consumers -= 1
+            if self._consumers != 0:
+                return
+            result = self.result
+            self.result = None
+            self._shares = None
+        if self.memory is not None:
+            self.memory.release(self, result)
+
+    def dependency_error(self) -> Optional[Exception]:
+        for dep in self.dependencies:
+            if dep.error is not None:
+                return dep.error
+        return None
+
+    def value(self) -> Any:
+        """
+        Return result or raise error of evaluation
+        """
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def result_for(self, dependant: "_Job") -> Any:
+        if isinstance(self.result, Spilled):
+            return self.result.load()
+        if self._shares is None:
+            return self.result
+        return self._shares[self.dependants.index(dependant)]
+
+    def kwargs(self) -> dict[str, Any]:
+        return {dep.name: dep.result_for(self) for dep in self.dependencies}
+
+
+def _transform(task: Task[T], meta: Meta, kwargs: dict[str, Any]) -> T:
+    """
+    Call transform of task from synchronous code, result of async task is awaited in new event loop
+    """
+    result = task.transform(meta, **kwargs)
+    if inspect.isawaitable(result):
+        return asyncio.run(result)
+    return result
+
+
+def _plan(metas: Iterable[Meta], task_node: TaskNode, cache: Optional[Cache] = None,
+          memory: Optional[MemoryMonitor] = None) -> tuple[list[_Job], list[_Job]]:
+    """
+    Flatten task node graph into jobs in topological order and return them with root job of every meta.
+    Nodes with the same task, workspace and meta become one job, also for different root metas
+    """
+    jobs = []
+    planned: dict[tuple, _Job] = {}
+
+    def visit(meta: Meta, node: TaskNode) -> _Job:
+        key = TaskNode.key(node.task, node.workspace), meta_key(meta)
+        if key in planned:
+            return planned[key]
+        job = _Job(node, meta, cache, memory)
+        planned[key] = job
+        for dep in node.dependencies:
+            dep_job = visit(get_meta_attr(meta, dep.task.name, {}), dep)
+            job.dependencies.append(dep_job)
+            dep_job.dependants.append(job)
+        if cache is not None:
+            job.key = result_key(node.task, meta, (dep.key for dep in job.dependencies))
+        jobs.append(job)
+        return job
+
+    roots = [visit(meta, task_node) for meta in metas]
+    if cache is None:
+        return jobs, roots
+    return _prune(jobs, roots, cache), roots
+
+
+def _prune(jobs: list[_Job], roots: list[_Job], cache: Cache) -> list[_Job]:
+    """
+    Load cached results and drop jobs which are needed only for cached ones
+    """
+    needed: set[_Job] = set()
+    cached: dict[_Job, Any] = {}
+    stack = list(roots)
+    while stack:
+        job = stack.pop()
+        if job in needed or job in cached:
+            continue
+        if job.key is not None:
+            try:
+                cached[job] = cache.get(job.key)
+                continue
+            except KeyError:
+                pass
+        needed.add(job)
+        stack.extend(job.dependencies)
+
+    jobs = [job for job in jobs if job in needed or job in cached]
+    for job in jobs:
+        job.dependants = [d for d in job.dependants if d in needed]
+    for job, result in cached.items():
+        job.dependencies = []
+        job.set_result(result)
+    return jobs
+
+
+def _priorities(jobs: list[_Job], cost_model: CostModel) -> dict[_Job, float]:
+    """
+    Return estimated duration of the longest path from every job to the end of run
+    """
+    remaining: dict[_Job, float] = {}
+    for job in reversed(jobs):
+        tail = max((remaining.get(d, 0.0) for d in job.dependants), default=0.0)
+        remaining[job] = (0.0 if job.done else cost_model.cost(job.name, job.meta)) + tail
+    return remaining
+
+
+def _execute(jobs: list[_Job], submit: Callable[[_Job, dict[str, Any]], Future],
+             max_workers: Optional[int] = None, priorities: Optional[dict[_Job, float]] = None) -> Iterator[_Job]:
+    """
+    Submit every job as soon as all its dependencies are finished and yield jobs as they finish.
+    At most max_workers jobs are submitted at once, ready job with higher priority is submitted first.
+    Job which dependency is failed is not submitted and fails with the same error
+    """
+    waiting = {job: sum(not dep.done for dep in job.dependencies) for job in jobs if not job.done}
+    order = {job: i for i, job in enumerate(jobs)}
+    running: dict[Future, _Job] = {}
+    finished: deque[_Job] = deque()
+    ready: list[tuple[float, int, _Job]] = []
+
+    def push(job: _Job):
+        heapq.heappush(ready, (-priorities.get(job, 0.0) if priorities else 0.0, order[job], job))
+
+    for job, count in waiting.items():
+        if count == 0:
+            push(job)
+
+    for job in jobs:
+        if job.done:
+            yield job
+
+    while True:
+        while ready and (max_workers is None or len(running) < max_workers):
+            job = heapq.heappop(ready)[2]
+            error = job.dependency_error()
+            if error is not None:
+                job.fail(error)
+                finished.append(job)
+                continue
+            try:
+                running[submit(job, job.kwargs())] = job
+            except Exception as e:
+                job.fail(e)
+                finished.append(job)
+
+        while finished:
+            job = finished.popleft()
+            yield job
+            for dependant in job.dependants:
+                waiting[dependant] -= 1
+                if waiting[dependant] == 0:
+                    push(dependant)
+        if ready and (max_workers is None or len(running) < max_workers):
+            continue
+        if not running:
+            return
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            job = running.pop(future)
+            try:
+                job.finish(future.result())
+            except Exception as e:
+                job.fail(e)
+            finished.append(job)
+
+
+def _evaluate_in_order(jobs: list[_Job], call: Callable[[_Job, dict[str, Any]], Any]) -> Iterator[_Job]:
+    """
+    Evaluate jobs one by one in current thread and yield them
+    """
+    for job in jobs:
+        if not job.done:
+            error = job.dependency_error()
+            if error is not None:
+                job.fail(error)
+            else:
+                try:
+                    job.finish(call(job, job.kwargs()))
+                except Exception as e:
+                    job.fail(e)
+        yield job
+
+
+def _root_futures(job: _Job, indices: list[int]) -> Iterator[tuple[int, Future]]:
+    results: list[Any] = [job.result] * len(indices)
+    if job.error is None and isinstance(job.result, Iterator) and len(indices) > 1:
+        results = Broadcast(job.result, len(indices)).consumers
+    for index, result in zip(indices, results):
+        future = Future()
+        if job.error is not None:
+            future.set_exception(job.error)
+        else:
+            future.set_result(result)
+        yield index, future
+
+
+def _collect(finished: Iterable[_Job], roots: list[_Job]) -> Iterator[tuple[int, Future]]:
+    """
+    Yield index of meta and future with its result as soon as root job is finished
+    """
+    indices: dict[_Job, list[int]] = {}
+    for index, root in enumerate(roots):
+        indices.setdefault(root, []).append(index)
+    for job in finished:
+        if job in indices:
+            yield from _root_futures(job, indices.pop(job))
+
+
 class TaskRunner(ABC, Generic[T]):
+    """
+    Base runner, results of tasks are taken from cache if it is given,
+    every evaluation is recorded by tracer and held results are counted by memory monitor if they are given
+    """
+
+    def __init__(self, cache: Optional[Cache] = None, tracer: Optional[Tracer] = None,
+                 memory: Optional[MemoryMonitor] = None, cost_model: Optional[CostModel] = None):
+        self.cache = cache
+        self.tracer = tracer
+        self.memory = memory
+        self.cost_model = cost_model
+
+    def _call(self, job: _Job, kwargs: dict[str, Any]) -> Any:
+        call = partial(_transform, job.node.task, job.meta, kwargs)
+        if self.memory is not None:
+            call = partial(self.memory.measure, job.name, call)
+        if self.tracer is not None:
+            call = partial(self.tracer.trace, job.name, job.workspace_name, call)
+        if self.cost_model is None:
+            return call()
+        start = time.perf_counter()
+        result = call()
+        self.cost_model.observe(job.name, job.meta, time.perf_counter() - start)
+        return result
+
+    def _priorities(self, jobs: list[_Job]) -> Optional[dict[_Job, float]]:
+        if self.cost_model is None:
+            return None
+        return _priorities(jobs, self.cost_model)
 
     @abstractmethod
     def run(self, meta: Meta, task_node: TaskNode[T]) -> T:
         pass
 
+    def run_many(self, metas: list[Meta], task_node: TaskNode[T]) -> Iterator[tuple[int, Future]]:
+        """
+        Run task node for every meta and yield index of meta with future of its result in completion order
+        """
+        for index, meta in enumerate(metas):
+            future = Future()
+            try:
+                result = self.run(meta, task_node)
+                if inspect.isawaitable(result):
+                    result = asyncio.run(result)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+            yield index, future
+
 
 class SimpleRunner(TaskRunner[T]):
     def run(self, meta: Meta, task_node: TaskNode[T]) -> T:
-        dc = {}
-        for dep in task_node.dependencies:
-            meta_new = get_meta_attr(meta, dep.task.name, {})
-            dc[dep.task.name] = self.run(meta_new, dep)
-        return task_node.task.transform(meta, **dc)
+        jobs, roots = _plan([meta], task_node, self.cache, self.memory)
+        for _ in _evaluate_in_order(jobs, self._call):
+            pass
+        return roots[0].value()
+
+    def run_many(self, metas: list[Meta], task_node: TaskNode[T]) -> Iterator[tuple[int, Future]]:
+        jobs, roots = _plan(metas, task_node, self.cache, self.memory)
+        return _collect(_evaluate_in_order(jobs, self._call), roots)
 
 
 class ThreadingRunner(TaskRunner[T]):
+    """
+    Runs every task node on one shared pool, node starts as soon as its own dependencies are finished
+    """
     MAX_WORKERS = 5
 
+    def __init__(self, max_workers: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_workers = max_workers or ThreadingRunner.MAX_WORKERS
+
     def run(self, meta: Meta, task_node: TaskNode[T]) -> T:
-        dc = {}
-        meta_new = [get_meta_attr(meta, dep.task.name, {})
-                    for dep in task_node.dependencies]
-        with ThreadPoolExecutor(max_workers=ThreadingRunner.MAX_WORKERS) as executor:
-            lst = list(executor.map(
-                self.run, meta_new, task_node.dependencies))
-        dc = {task_node.dependencies[i].task.name: lst[i]
-              for i in range(len(lst))}
-        return task_node.task.transform(meta, **dc)
+        with closing(self.run_many([meta], task_node)) as results:
+            for _, future in results:
+                return future.result()
+
+    def run_many(self, metas: list[Meta], task_node: TaskNode[T]) -> Iterator[tuple[int, Future]]:
+        jobs, roots = _plan(metas, task_node, self.cache, self.memory)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            yield from _collect(_execute(jobs, partial(executor.submit, self._call),
+                                         self.max_workers, self._priorities(jobs)), roots)
 
 
 class AsyncRunner(TaskRunner[T]):
+    """
+    Runs sibling dependencies concurrently, async tasks are awaited in the event loop
+    and blocking tasks are offloaded to the default executor
+    """
+
     async def run(self, meta: Meta, task_node: TaskNode[T]) -> T:
-        dc = {}
-        for dep in task_node.dependencies:
-            meta_new = get_meta_attr(meta, dep.task.name, {})
-            dc[dep.task.name] = await self.run(meta_new, dep)
-        return task_node.task.transform(meta, **dc)
+        jobs, roots = _plan([meta], task_node, self.cache, self.memory)
+        await asyncio.gather(*self._schedule(jobs, asyncio.get_running_loop()).values())
+        return roots[0].value()
+
+    def run_many(self, metas: list[Meta], task_node: TaskNode[T]) -> Iterator[tuple[int, Future]]:
+        jobs, roots = _plan(metas, task_node, self.cache, self.memory)
+        loop = asyncio.new_event_loop()
+        futures = self._schedule(jobs, loop)
+        try:
+            yield from _collect((job for job in jobs if job.done), roots)
+            pending = {futures[root] for root in roots if root in futures}
+            jobs = {future: job for job, future in futures.items()}
+            while pending:
+                done, pending = loop.run_until_complete(asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+                yield from _collect([jobs[future] for future in done], roots)
+        finally:
+            for future in futures.values():
+                future.cancel()
+            loop.run_until_complete(asyncio.gather(*futures.values(), return_exceptions=True))
+            loop.close()
+
+    def _schedule(self, jobs: list[_Job], loop: asyncio.AbstractEventLoop) -> dict[_Job, asyncio.Future]:
+        futures: dict[_Job, asyncio.Future] = {}
+        for job in jobs:
+            if not job.done:
+                futures[job] = loop.create_task(
+                    self._evaluate(job, [futures[dep] for dep in job.dependencies if dep in futures]))
+        return futures
+
+    async def _evaluate(self, job: _Job, dependencies: list[asyncio.Future]):
+        await asyncio.gather(*dependencies)
+        error = job.dependency_error()
+        if error is not None:
+            job.fail(error)
+            return
+        kwargs = job.kwargs()
+        task = job.node.task
+        try:
+            if task.is_async:
+                result = await self._await(job, kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(None, partial(self._call, job, kwargs))
+            job.finish(result)
+        except Exception as e:
+            job.fail(e)
+
+    async def _await(self, job: _Job, kwargs: dict[str, Any]) -> Any:
+        """
+        Await async task with the same tracing, memory and cost accounting as _call
+        """
+        call = partial(job.node.task.transform, job.meta, **kwargs)
+        if self.memory is not None:
+            call = partial(self.memory.async_measure, job.name, call)
+        start = time.perf_counter()
+        if self.tracer is None:
+            result = await call()
+        else:
+            event = self.tracer.start(job.name, job.workspace_name)
+            try:
+                result = await call()
+            except BaseException as e:
+                self.tracer.finish(event, error=e)
+                raise
+            result = self.tracer.finish(event, result)
+        if self.cost_model is not None:
+            self.cost_model.observe(job.name, job.meta, time.perf_counter() - start)
+        return result
+
+
+TaskAddress = tuple[str, Optional[str], str]
+
+
+def task_address(task_node: TaskNode) -> Optional[TaskAddress]:
+    """
+    Return (module, workspace, task path) by which task node can be found in another process
+    or None if workspace is not importable
+    """
+    workspace = task_node.workspace
+    if workspace.find_task(task_node.task.name) is not task_node.task:
+        return None
+    module = sys.modules.get(workspace.name)
+    if module is not None and getattr(module, "_stem_workspace", None) is workspace:
+        return workspace.name, None, task_node.task.name
+    module_name = type(workspace).__module__
+    module = sys.modules.get(module_name)
+    if module is not None and getattr(module, workspace.name, None) is workspace:
+        return module_name, workspace.name, task_node.task.name
+    return None
+
+
+def _find_workspace_by_address(address: TaskAddress) -> IWorkspace:
+    module_name, workspace_name, _ = address
+    module = import_module(module_name)
+    if workspace_name is None:
+        return IWorkspace.module_workspace(module)
+    return getattr(module, workspace_name)
+
+
+def _find_by_address(address: TaskAddress):
+    return _find_workspace_by_address(address).find_task(address[2])
+
+
+def find_node_by_address(address: TaskAddress) -> TaskNode:
+    """
+    Return task node of task address, it is used to find task in another process
+    """
+    workspace = _find_workspace_by_address(address)
+    return TaskNode(workspace.find_task(address[2]), workspace)
+
+
+class _Chunked(Iterator):
+    """
+    Iterator of parent process which is transferred to worker as list of chunks instead of lazy object
+    """
+
+    def __init__(self, chunks: list[list]):
+        self._chunks = chunks
+        self._items = chain.from_iterable(chunks)
+
+    def __next__(self):
+        return next(self._items)
+
+    def __reduce__(self):
+        return _Chunked, (self._chunks,)
+
+    @staticmethod
+    def pack(value: Any, chunk_size: int) -> Any:
+        if isinstance(value, (_Chunked, _Received)) or not isinstance(value, Iterator):
+            return value
+        chunks = []
+        while chunk := list(islice(value, chunk_size)):
+            chunks.append(chunk)
+        return _Chunked(chunks)
+
+
+class _Received(Iterator):
+    """
+    Iterator over chunks which worker process puts into channel while it produces them.
+    It is transferred to another worker as the channel, so the stream goes there directly
+    """
+
+    def __init__(self, channel: Any, items: Iterable = (), fetched: Iterable = (), complete: bool = False):
+        self._channel = channel
+        self._items = iter(items)
+        self._fetched = deque(fetched)
+        self._complete = complete
+
+    def _get(self) -> tuple[str, Any]:
+        if self._fetched:
+            return self._fetched.popleft()
+        if self._complete:
+            return "end", None
+        message = self._channel.get()
+        self._complete = message[0] != "items"
+        return message
+
+    def __next__(self):
+        while True:
+            for item in self._items:
+                return item
+            kind, payload = self._get()
+            if kind == "error":
+                raise payload
+            if kind != "items":
+                raise StopIteration
+            self._items = iter(payload)
+
+    def fetch(self):
+        """
+        Read the rest of stream from channel, so iterator can outlive the channel
+        """
+        while not self._complete:
+            message = self._channel.get()
+            self._fetched.append(message)
+            self._complete = message[0] != "items"
+
+    def __reduce__(self):
+        return _Received, (self._channel, list(self._items), list(self._fetched), self._complete)
+
+
+def _send(result: Any, channel: Any, chunk_size: int):
+    """
+    Put result into channel, iterator is sent by chunks of chunk_size items as soon as they are produced
+    """
+    if not isinstance(result, Iterator):
+        channel.put(("value", result))
+        return
+    channel.put(("stream", None))
+    try:
+        while chunk := list(islice(result, chunk_size)):
+            channel.put(("items", chunk))
+    except Exception as e:
+        channel.put(("error", e))
+    else:
+        channel.put(("end", None))
+
+
+def _transform_by_address(address: TaskAddress, meta: Meta, kwargs: dict[str, Any], channel: Any,
+                          chunk_size: int, traced: bool) -> Optional[TraceEvent]:
+    """
+    Transform in worker process and send result through channel,
+    trace event is returned when iterator result is sent completely, so its items are counted
+    """
+    tracer = Tracer() if traced else None
+    try:
+        task = _find_by_address(address)
+        if tracer is None:
+            result = _transform(task, meta, kwargs)
+        else:
+            result = tracer.trace(address[2], address[1] or address[0], _transform, task, meta, kwargs)
+    except Exception as e:
+        channel.put(("error", e))
+    else:
+        _send(result, channel, chunk_size)
+    return tracer.events[0] if tracer is not None and tracer.events else None
+
+
+def _receive(channel: Any) -> Any:
+    kind, payload = channel.get()
+    if kind == "error":
+        raise payload
+    if kind == "stream":
+        return _Received(channel)
+    return payload
 
 
 class ProcessingRunner(TaskRunner[T]):
+    """
+    Runs task nodes in worker processes, tasks are found in workers by workspace and task path.
+    Iterator results are streamed from workers by chunks of CHUNK_SIZE items through channels of manager process,
+    so dependant starts while producer is still running. Iterators of parent process are sent to workers by chunks
+    """
     MAX_WORKERS = os.cpu_count()
+    CHUNK_SIZE = 1024
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_workers = max_workers or ProcessingRunner.MAX_WORKERS
+        self.chunk_size = chunk_size or ProcessingRunner.CHUNK_SIZE
+
+    def _submit(self, executor: ProcessPoolExecutor, receiver: ThreadPoolExecutor, manager: SyncManager,
+                job: _Job, kwargs: dict[str, Any]) -> Future:
+        address = task_address(job.node)
+        if address is None:
+            future = Future()
+            try:
+                future.set_result(self._call(job, kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        channel = manager.Queue()
+        kwargs = {k: _Chunked.pack(v, self.chunk_size) for k, v in kwargs.items()}
+        worker = executor.submit(_transform_by_address, address, job.meta, kwargs, channel, self.chunk_size,
+                                 self.tracer is not None)
+        worker.add_done_callback(partial(self._finished, channel))
+        future = receiver.submit(_receive, channel)
+        if self.cost_model is not None:
+            self._observe(future, job)
+        return future
+
+    def _finished(self, channel: Any, worker: Future):
+        if worker.exception() is not None:
+            channel.put(("error", worker.exception()))
+        elif worker.result() is not None:
+            self.tracer.record(worker.result())
+
+    def _observe(self, future: Future, job: _Job):
+        """
+        Record duration from submit to result, it includes transfer of arguments and result between processes
+        """
+        start = time.perf_counter()
+
+        def done(f: Future):
+            if f.exception() is None:
+                self.cost_model.observe(job.name, job.meta, time.perf_counter() - start)
+
+        future.add_done_callback(done)
+
+    def run(self, meta: Meta, task_node: TaskNode[T]) -> T:
+        with closing(self.run_many([meta], task_node)) as results:
+            for _, future in results:
+                return future.result()
+
+    def run_many(self, metas: list[Meta], task_node: TaskNode[T]) -> Iterator[tuple[int, Future]]:
+        jobs, roots = _plan(metas, task_node, self.cache, self.memory)
+        with Manager() as manager, ThreadPoolExecutor(max_workers=self.max_workers) as receiver, \
+                ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                yield from _collect(_execute(jobs, partial(self._submit, executor, receiver, manager),
+                                             self.max_workers, self._priorities(jobs)), roots)
+            finally:
+                for root in roots:
+                    if isinstance(root.result, _Received):
+                        root.result.fetch()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+def _drain(queue: Queue, stop: Event, timeout: float) -> Iterator:
+    while True:
+        try:
+            item = queue.get(timeout=timeout)
+        except Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is _END:
+            return
+        if isinstance(item, _Failure):
+            raise item.error
+        yield item
+
+
+def _put(queue: Queue, item: Any, stop: Event, timeout: float) -> bool:
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=timeout)
+            return True
+        except Full:
+            pass
+    return False
+
+
+def _closing(result: Iterator, close: Callable[[], None]) -> Iterator:
+    try:
+        yield from result
+    finally:
+        close()
+
+
+class _Pipeline:
+    """
+    Stages of one StreamingRunner run on shared pool, stage is submitted when its dependencies are ready
+    """
+
+    def __init__(self, runner: "StreamingRunner", jobs: list[_Job], root: _Job):
+        self.runner = runner
+        self.root = root
+        self.stop = Event()
+        self.ready = {job: Event() for job in jobs if not job.done}
+        self.waiting = {job: sum(dep in self.ready for dep in job.dependencies) for job in self.ready}
+        self._lock = Lock()
+        self._slots = Semaphore(runner.max_workers - 1)
+        self._executor = ThreadPoolExecutor(max_workers=runner.max_workers, thread_name_prefix="stem-stream")
+
+    def start(self):
+        sources = [job for job, count in self.waiting.items() if count == 0 and job is not self.root]
+        for job in sources:
+            self._executor.submit(self._stage, job)
+
+    def kwargs(self, job: _Job) -> dict[str, Any]:
+        for dep in job.dependencies:
+            if dep in self.ready:
+                self.ready[dep].wait()
+        error = job.dependency_error()
+        if error is not None:
+            raise error
+        return job.kwargs()
+
+    def _set_ready(self, job: _Job):
+        self.ready[job].set()
+        with self._lock:
+            if self.stop.is_set():
+                return
+            for dependant in job.dependants:
+                self.waiting[dependant] -= 1
+                if self.waiting[dependant] == 0 and dependant is not self.root:
+                    self._executor.submit(self._stage, dependant)
+
+    def _stage(self, job: _Job):
+        try:
+            result = self.runner._call(job, self.kwargs(job))
+        except Exception as e:
+            job.fail(e)
+            self._set_ready(job)
+            return
+        if not isinstance(result, Iterator) or len(job.dependants) != 1 or job.cache is not None \
+                or not self._slots.acquire(blocking=False):
+            job.finish(result)
+            self._set_ready(job)
+            return
+        try:
+            queue = Queue(maxsize=self.runner.queue_size)
+            job.set_result(_drain(queue, self.stop, self.runner.TIMEOUT))
+            self._set_ready(job)
+            self._pump(result, queue)
+        finally:
+            self._slots.release()
+            job._consume()
+
+    def _pump(self, result: Iterator, queue: Queue):
+        timeout = self.runner.TIMEOUT
+        try:
+            for item in result:
+                if not _put(queue, item, self.stop, timeout):
+                    return
+        except Exception as e:
+            _put(queue, _Failure(e), self.stop, timeout)
+        else:
+            _put(queue, _END, self.stop, timeout)
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+
+    def close(self):
+        """
+        Stop blocked stages and join threads of pool
+        """
+        with self._lock:
+            self.stop.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class StreamingRunner(TaskRunner[T]):
+    """
+    Runs task nodes on one bounded pool of threads. Iterator result consumed by a single dependant is streamed
+    to it through bounded queue, so producer waits when consumer falls behind by QUEUE_SIZE items.
+    At most max_workers - 1 producers stream at once, iterator of other producers is consumed lazily by dependant.
+    Stages are stopped and joined when root fails or when its iterator result is exhausted or closed
+    """
+    QUEUE_SIZE = 64
+    MAX_WORKERS = 8
+    TIMEOUT = 0.1  # seconds between checks of stop by blocked stage
+
+    def __init__(self, queue_size: Optional[int] = None, max_workers: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.queue_size = queue_size or StreamingRunner.QUEUE_SIZE
+        self.max_workers = max(max_workers or StreamingRunner.MAX_WORKERS, 2)
 
     def run(self, meta: Meta, task_node: TaskNode[T]) -> T:
-        dc = {}
-        meta_new = [get_meta_attr(meta, dep.task.name, {})
-                    for dep in task_node.dependencies]
-        with Pool(ProcessingRunner.MAX_WORKERS) as p:
-            lst = p.starmap(self.run, list(
-                zip(meta_new, task_node.dependencies)))
-        dc = {task_node.dependencies[i].task.name: lst[i]
-              for i in range(len(lst))}
-        return task_node.task.transform(meta, **dc)
+        jobs, roots = _plan([meta], task_node, self.cache, self.memory)
+        root = roots[0]
+        if root.done:
+            return root.value()
+        pipeline = _Pipeline(self, jobs, root)
+        try:
+            pipeline.start()
+            root.finish(self._call(root, pipeline.kwargs(root)))
+        except BaseException:
+            pipeline.close()
+            raise
+        if isinstance(root.result, Iterator):
+            return _closing(root.result, pipeline.close)
+        pipeline.close()
+        return root.result
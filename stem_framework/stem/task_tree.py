@@ -6,18 +6,30 @@ from stem.workspace import IWorkspace
 T = TypeVar("T")
 
 
+class TaskCycleError(Exception):
+    pass
+
+
 class TaskNode(Generic[T]):
-    def __init__(self, task: Task[T], workspace: Optional[IWorkspace] = None):
+    def __init__(self, task: Task[T], workspace: Optional[IWorkspace] = None,
+                 nodes: Optional[dict[tuple[int, int], "TaskNode"]] = None):
         self.task = task
         if workspace is None:
             wrs = IWorkspace.find_default_workspace(task)
         else:
             wrs = workspace
         self.workspace = wrs
+        self._nodes = {} if nodes is None else nodes
+        self._nodes[TaskNode.key(task, wrs)] = self
+        self._dependencies = None
         self._dependencies = self.set_dependencies()
         self._unresolved_dependencies = self.set_unresolved_dependencies()
         self._has_dependence_errors = self.set_has_dependence_errors()
 
+    @staticmethod
+    def key(task: Task, workspace: IWorkspace) -> tuple[int, int]:
+        return id(task), id(workspace)
+
     @property
     def dependencies(self) -> list["TaskNode"]:
         return self._dependencies
@@ -37,12 +49,19 @@ class TaskNode(Generic[T]):
         return self._has_dependence_errors
 
     def set_dependencies(self) -> list["TaskNode"]:
+        """
+        Resolve dependencies, nodes of the same task and workspace are shared within one graph
+        """
         resolved_dependencies = []
         for d in self.task.dependencies:
-            if self.workspace.has_task(d):
-                resolved_dependencies.append(
-                    TaskNode(self.workspace.find_task(d), self.workspace)
-                )
+            task = self.workspace.find_task(d)
+            if task is not None:
+                node = self._nodes.get(TaskNode.key(task, self.workspace))
+                if node is None:
+                    node = TaskNode(task, self.workspace, self._nodes)
+                elif node._dependencies is None:
+                    raise TaskCycleError("Dependency cycle: {0} -> {1}".format(self.task.name, task.name))
+                resolved_dependencies.append(node)
         return resolved_dependencies
 
     def set_unresolved_dependencies(self) -> list["str"]:
@@ -67,23 +86,27 @@ class TaskNode(Generic[T]):
 
 
 class TaskTree:
+    """
+    Task graph with index of nodes by task and workspace, the index is built in the same traversal as nodes
+    """
+
     def __init__(self, root: Task, workspace=None):
-        self.root = TaskNode(root, workspace)
+        self._nodes: dict[tuple[int, int], TaskNode] = {}
+        self.root = TaskNode(root, workspace, self._nodes)
 
-    def find_task(self, task, workspace=None) -> TaskNode[T]:
+    @staticmethod
+    def build_node(task: Task[T], workspace: Optional[IWorkspace] = None) -> TaskNode[T]:
+        return TaskNode(task, workspace)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def find_task(self, task, workspace=None) -> Optional[TaskNode[T]]:
         if workspace is None:
             wrs = IWorkspace.find_default_workspace(task)
         else:
             wrs = workspace
-        if task == self.root.task and wrs == self.root.workspace:
-            return self.root
-        else:
-            for dep in self.root.dependencies:
-                tree = TaskTree(dep.task, dep.workspace)
-                node = tree.find_task(task, workspace)
-                if node is not None:
-                    return node
-        return None
+        return self._nodes.get(TaskNode.key(task, wrs))
 
     def resolve_node(self, task: Task[T], workspace: Optional[IWorkspace] = None) -> TaskNode[T]:
         if workspace is None:
@@ -92,6 +115,6 @@ class TaskTree:
             wrs = workspace
         node = self.find_task(task, wrs)
         if node is None:
-            return TaskNode(task, workspace)
+            return TaskNode(task, wrs, self._nodes)
         else:
             return node
@@ -0,0 +1,120 @@
+"""
+Tracing of task evaluations and export to Chrome trace event format
+"""
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, asdict
+from threading import Lock
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class TraceEvent:
+    task: str
+    workspace: Optional[str]
+    pid: int
+    tid: int
+    start: float
+    wall: float = 0.0
+    cpu: float = 0.0
+    items: Optional[int] = None
+    error: Optional[str] = None
+
+
+class _Counting(Iterator):
+    """
+    Iterator which counts items in event while they are consumed
+    """
+
+    def __init__(self, source: Iterator, event: TraceEvent):
+        self._source = source
+        self._event = event
+        event.items = 0
+
+    def __next__(self):
+        item = next(self._source)
+        self._event.items += 1
+        return item
+
+
+class Tracer:
+    """
+    Collects start and finish of every task evaluation.
+    Subclasses can override on_start and on_finish to forward events elsewhere.
+    Wall and CPU time cover transform call only, items of iterator result are counted when they are consumed
+    """
+
+    def __init__(self):
+        self.events: list[TraceEvent] = []
+        self._lock = Lock()
+
+    def start(self, task: str, workspace: Optional[str] = None) -> TraceEvent:
+        event = TraceEvent(task, workspace, os.getpid(), threading.get_ident(), time.time())
+        event.cpu = time.thread_time()
+        self.on_start(event)
+        return event
+
+    def finish(self, event: TraceEvent, result: Any = None, error: Optional[BaseException] = None) -> Any:
+        event.wall = time.time() - event.start
+        event.cpu = time.thread_time() - event.cpu
+        if error is not None:
+            event.error = repr(error)
+        self.record(event)
+        if isinstance(result, Iterator):
+            return _Counting(result, event)
+        return result
+
+    def trace(self, task: str, workspace: Optional[str], func: Callable, *args) -> Any:
+        """
+        Call func with args and record it as evaluation of task
+        """
+        event = self.start(task, workspace)
+        try:
+            result = func(*args)
+        except BaseException as e:
+            self.finish(event, error=e)
+            raise
+        return self.finish(event, result)
+
+    def record(self, event: TraceEvent):
+        """
+        Add finished event, events measured in another process are recorded by this method too
+        """
+        with self._lock:
+            self.events.append(event)
+        self.on_finish(event)
+
+    def on_start(self, event: TraceEvent):
+        pass
+
+    def on_finish(self, event: TraceEvent):
+        pass
+
+    def to_chrome(self) -> dict[str, Any]:
+        """
+        Return events in Chrome trace event format, time is in microseconds
+        """
+        with self._lock:
+            events = list(self.events)
+        origin = min((event.start for event in events), default=0.0)
+        trace_events = []
+        for event in events:
+            args = asdict(event)
+            trace_events.append({
+                "name": event.task,
+                "cat": event.workspace or "",
+                "ph": "X",
+                "ts": (event.start - origin) * 1e6,
+                "dur": event.wall * 1e6,
+                "pid": event.pid,
+                "tid": event.tid,
+                "args": {k: args[k] for k in ("workspace", "cpu", "items", "error")},
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def save_chrome(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_chrome(), f)
@@ -1,17 +1,21 @@
 """
 Conception modularity software
 """
+import json
+import sys
 from abc import ABC, abstractmethod, ABCMeta
 from types import ModuleType
 from typing import Optional, Any, Type, TypeVar, Union
 from importlib import import_module
 
-from stem.core import Named
+from stem.core import Named, register_definition, definition_kind
 from stem.meta import Meta
 from stem.task import Task
 
 T = TypeVar("T")
 
+_manifest: dict[str, dict[str, list[str]]] = {}
+
 
 class TaskPath:
     def __init__(self, path: Union[str, list[str]]):
@@ -54,6 +58,10 @@ class ProxyTask(Task[T]):
     def specification(self):
         return self._task.specification
 
+    @property
+    def is_async(self) -> bool:
+        return self._task.is_async
+
     def check_by_meta(self, meta: Meta):
         self._task.check_by_meta(meta)
 
@@ -62,6 +70,8 @@ class ProxyTask(Task[T]):
 
 
 class IWorkspace(ABC, Named):
+    _task_index: Optional[dict[str, tuple[Task, "IWorkspace"]]] = None
+
     @property
     @abstractmethod
     def tasks(self) -> dict[str, Task]:
@@ -69,33 +79,51 @@ class IWorkspace(ABC, Named):
 
     @property
     @abstractmethod
-    def workspaces(self) -> set["IWorkspace"]:
+    def workspaces(self) -> list["IWorkspace"]:
         pass
 
     def __eq__(self, obj: "IWorkspace"):
         return self.tasks == obj.tasks and self.workspaces == obj.workspaces
 
+    @property
+    def task_index(self) -> dict[str, tuple[Task, "IWorkspace"]]:
+        """
+        Flat map from short and qualified task path to task and workspace which owns it, it is built once
+        """
+        if self._task_index is None:
+            self._build_index()
+        return self._task_index
+
+    def _build_index(self):
+        """
+        Build task index, short name is resolved to own task first,
+        then to task of the first nested workspace which has it
+        """
+        index = {name: (task, self) for name, task in self.tasks.items()}
+        for wks in self.workspaces:
+            for path, found in wks.task_index.items():
+                if "." not in path:
+                    index.setdefault(path, found)
+        heads = set()
+        for wks in self.workspaces:
+            if wks.name not in heads:
+                heads.add(wks.name)
+                for path, found in wks.task_index.items():
+                    index["{0}.{1}".format(wks.name, path)] = found
+        self._task_index = index
+
+    def resolve_task(self, task_path: Union[str, TaskPath]) -> Optional[tuple[Task, "IWorkspace"]]:
+        """
+        Return task and workspace which owns it
+        """
+        return self.task_index.get(str(task_path))
+
     def find_task(self, task_path: Union[str, TaskPath]) -> Optional[Task]:
-        if not isinstance(task_path, TaskPath):
-            task_path = TaskPath(task_path)
-        if task_path.is_leaf:
-            if task_path.name in self.tasks:
-                for task in self.tasks:
-                    if task == task_path.name:
-                        return self.tasks[task]
-            for wrs in self.workspaces:
-                task = wrs.find_task(task_path)
-                if task is not None:
-                    return task
-            return None
-        else:
-            for wks in self.workspaces:
-                if wks.name == task_path.head:
-                    return wks.find_task(task_path.sub_path)
-            return None
+        found = self.resolve_task(task_path)
+        return None if found is None else found[0]
 
     def has_task(self, task_path: Union[str, TaskPath]) -> bool:
-        return IWorkspace.find_task(self, task_path) is not None
+        return str(task_path) in self.task_index
 
     def get_workspace(self, name) -> Optional["IWorkspace"]:
         for workspace in self.workspaces:
@@ -117,29 +145,22 @@ class IWorkspace(ABC, Named):
     def find_default_workspace(task: Task) -> Type["IWorkspace"]:
         if hasattr(task, "_stem_workspace"):
             return getattr(task, "_stem_workspace")
-        else:
+        module = sys.modules.get(task.__module__)
+        if module is None:
             module = import_module(task.__module__)
         return IWorkspace.module_workspace(module)
 
     @staticmethod
     def module_workspace(module: ModuleType) -> Type["IWorkspace"]:
+        """
+        Return workspace of module tasks and workspaces, it is built on first call.
+        Names listed in loaded manifest are taken without scan of the module
+        """
         if hasattr(module, "_stem_workspace"):
             return getattr(module, "_stem_workspace")
-        else:
-            tasks = {}
-            workspaces = []
-            for s in dir(module):
-                t = getattr(module, s)
-                try:
-                    mro = [s.__name__ for s in t.__mro__]
-                except:
-                    mro = [s.__name__ for s in t.__class__.__mro__]
-                if 'Task' in mro:
-                    tasks[s] = t
-                elif mro[1] == 'ILocalWorkspace':
-                    workspaces.append(t)
-            setattr(module, "_stem_workspace", LocalWorkspace(module.__name__, tasks, workspaces))
-            return getattr(module, "_stem_workspace")
+        tasks, workspaces = _discover(module)
+        setattr(module, "_stem_workspace", LocalWorkspace(module.__name__, tasks, list(workspaces.values())))
+        return getattr(module, "_stem_workspace")
 
 
 class ILocalWorkspace(IWorkspace):
@@ -148,7 +169,7 @@ class ILocalWorkspace(IWorkspace):
         return self._tasks
 
     @property
-    def workspaces(self) -> set["IWorkspace"]:
+    def workspaces(self) -> list["IWorkspace"]:
         return self._workspaces
 
 
@@ -157,6 +178,8 @@ class LocalWorkspace(ILocalWorkspace):
         self._name = name
         self._tasks = tasks
         self._workspaces = workspaces
+        register_definition(self, "workspace")
+        self._build_index()
 
 
 class Workspace(ABCMeta, ILocalWorkspace):
@@ -179,10 +202,6 @@ class Workspace(ABCMeta, ILocalWorkspace):
         for a, t in cls_attr_replaced.items():
             setattr(cls, a, t)
 
-        for a, t in cls.__dict__.items():
-            if isinstance(t, Task):
-                t._stem_workspace = cls()
-
         tasks = {a: t for a, t in cls.__dict__.items() if isinstance(t, Task)}
         cls._workspaces = workspaces
         cls._tasks = tasks
@@ -192,4 +211,60 @@ class Workspace(ABCMeta, ILocalWorkspace):
             return userclass
 
         cls.__call__ = __call
-        return cls()
\ No newline at end of file
+        workspace = cls()
+        for t in tasks.values():
+            t._stem_workspace = workspace
+        register_definition(workspace, "workspace")
+        workspace._build_index()
+        return workspace
+
+
+def _scan(module: ModuleType) -> tuple[dict[str, Task], dict[str, IWorkspace]]:
+    """
+    Find tasks and workspaces in one pass over module namespace. Tasks and local workspaces register themselves
+    when they are created, so other symbols are skipped by one lookup without introspection.
+    Workspace of the module itself is skipped
+    """
+    tasks = {}
+    workspaces = {}
+    for name, value in vars(module).items():
+        if name == "_stem_workspace":
+            continue
+        kind = definition_kind(value)
+        if kind == "task":
+            tasks[name] = value
+        elif kind == "workspace":
+            workspaces[name] = value
+    return tasks, workspaces
+
+
+def _discover(module: ModuleType) -> tuple[dict[str, Task], dict[str, IWorkspace]]:
+    names = _manifest.get(module.__name__)
+    if names is not None:
+        try:
+            return ({name: getattr(module, name) for name in names["tasks"]},
+                    {name: getattr(module, name) for name in names["workspaces"]})
+        except AttributeError:
+            pass
+    return _scan(module)
+
+
+def save_manifest(path: str, *modules: ModuleType):
+    """
+    Save names of tasks and workspaces of modules to JSON file
+    """
+    manifest = {}
+    for module in modules:
+        tasks, workspaces = _scan(module)
+        manifest[module.__name__] = {"tasks": list(tasks), "workspaces": list(workspaces)}
+    with open(path, "w") as f:
+        json.dump(manifest, f)
+
+
+def load_manifest(path: str):
+    """
+    Load manifest saved by save_manifest, module workspaces are built from it without module scan
+    """
+    with open(path) as f:
+        _manifest.update(json.load(f))
+
@@ -1,10 +1,11 @@
+import asyncio
 from functools import reduce
 from typing import Iterator
 
 import numpy as np
 
 from stem.meta import Meta, get_meta_attr
-from stem.task import DataTask, data, task
+from stem.task import DataTask, data, task, batches
 
 
 class IntRange(DataTask):
@@ -30,6 +31,13 @@ def float_range(meta: Meta) -> Iterator[float]:
         yield i
 
 
+@data
+def float_batches(meta: Meta) -> Iterator[np.ndarray]:
+    """Source of double number by batches"""
+    opts = meta.get("start", 0), meta.get("stop", 1), meta.get("step", 0.1)
+    return batches(np.arange(*opts, dtype="f"), meta.get("batch_size", 4))
+
+
 @data
 def data_scale(meta: Meta) -> int:
     return 10
@@ -53,3 +61,9 @@ def float_scale(meta: Meta, int_reduce: int, float_range: Iterator[float]) -> It
 @task
 def float_reduce(meta: Meta, float_scale: Iterator[float]) -> float:
     return sum(float_scale)
+
+
+@task
+async def int_sum(meta: Meta, int_range: Iterator[int]) -> int:
+    await asyncio.sleep(0)
+    return sum(int_range)
@@ -0,0 +1,20 @@
+from unittest import TestCase
+
+from benchmarks.run import compare
+from benchmarks.synthetic import MESH, task_count
+from stem.task_master import TaskMaster
+from stem.task_runner import ThreadingRunner
+
+
+class BenchmarkTest(TestCase):
+
+    def test_synthetic_workspace(self):
+        self.assertEqual(8 * 4 + 1, task_count(MESH))
+        self.assertEqual(("t2_1", "t2_2", "t2_3", "t2_4"), MESH.find_task("t3_1").dependencies)
+        result = TaskMaster(ThreadingRunner()).execute({}, MESH.find_task("root"), MESH)
+        self.assertEqual(8 * 1024, result.data)
+
+    def test_compare(self):
+        baseline = {"a": {"latency": 1.0, "memory": 100}}
+        self.assertEqual([], compare({"a": {"latency": 1.2, "memory": 100}}, baseline))
+        self.assertEqual(1, len(compare({"a": {"latency": 1.3, "memory": 100}}, baseline)))
@@ -0,0 +1,56 @@
+from threading import Thread
+from unittest import TestCase
+
+from stem.broadcast import Broadcast
+
+
+class BroadcastTest(TestCase):
+
+    def test_read_once(self):
+        reads = []
+
+        def source():
+            for i in range(10):
+                reads.append(i)
+                yield i
+
+        first, second = Broadcast(source(), 2).consumers
+        self.assertListEqual(list(range(10)), list(first))
+        self.assertListEqual(list(range(10)), list(second))
+        self.assertListEqual(list(range(10)), reads)
+
+    def test_spill(self):
+        broadcast = Broadcast(iter(range(100)), 2, window=10)
+        fast, slow = broadcast.consumers
+        self.assertListEqual(list(range(100)), list(fast))
+        self.assertEqual(90, broadcast.spilled)
+        self.assertListEqual(list(range(100)), list(slow))
+        self.assertEqual(0, broadcast.spilled)
+
+    def test_interleaved(self):
+        first, second = Broadcast(iter(range(50)), 2, window=3).consumers
+        result = [(next(first), next(first), next(second)) for _ in range(25)]
+        self.assertListEqual(list(range(50)), [x for r in result for x in r[:2]])
+        self.assertListEqual(list(range(25)), [r[2] for r in result])
+        self.assertListEqual(list(range(25, 50)), list(second))
+
+    def test_close(self):
+        broadcast = Broadcast(iter(range(100)), 2, window=10)
+        first, second = broadcast.consumers
+        second.close()
+        self.assertListEqual(list(range(100)), list(first))
+        self.assertEqual(0, broadcast.spilled)
+
+    def test_concurrent_consumers(self):
+        def source():
+            yield from range(10000)
+
+        consumers = Broadcast(source(), 8, window=16).consumers
+        results = [[] for _ in consumers]
+        threads = [Thread(target=result.extend, args=(consumer,)) for consumer, result in zip(consumers, results)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for result in results:
+            self.assertListEqual(list(range(10000)), result)
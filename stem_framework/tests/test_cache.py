@@ -0,0 +1,174 @@
+import tempfile
+from typing import Iterator
+from unittest import TestCase
+
+import numpy as np
+
+from stem.cache import ResultCache, MemoryCache, EvictionPolicy, result_key, sizeof, task_fingerprint
+from stem.meta import Meta, get_meta_attr
+from stem.task import data, task, ReduceTask
+from stem.task_master import TaskMaster
+from stem.task_runner import SimpleRunner, ThreadingRunner
+from stem.workspace import LocalWorkspace
+from tests.example_task import int_range, int_scale
+
+calls = []
+
+
+class Config:
+
+    def __init__(self, value):
+        self.value = value
+
+
+@data
+def cached_range(meta: Meta) -> Iterator[int]:
+    calls.append("cached_range")
+    return iter(range(get_meta_attr(meta, "stop", 10)))
+
+
+@data
+def cached_scale(meta: Meta) -> int:
+    calls.append("cached_scale")
+    return 10
+
+
+@task
+def cached_sum(meta: Meta, cached_range: Iterator[int], cached_scale: int) -> int:
+    calls.append("cached_sum")
+    return cached_scale * sum(cached_range)
+
+
+cached_workspace = LocalWorkspace("cached", {t.name: t for t in [cached_range, cached_scale, cached_sum]})
+
+
+class ResultCacheTest(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_key(self):
+        self.assertEqual(result_key(int_range, {"a": 1, "b": 2}), result_key(int_range, {"b": 2, "a": 1}))
+        self.assertNotEqual(result_key(int_range, {"a": 1}), result_key(int_range, {"a": 2}))
+        self.assertNotEqual(result_key(int_range, {}), result_key(int_scale, {}))
+        self.assertNotEqual(result_key(int_scale, {}, ["x"]), result_key(int_scale, {}, ["y"]))
+        self.assertEqual(result_key(int_range, {"a": 1}), result_key(int_range, {"a": 1, "task_master": TaskMaster()}))
+        self.assertIsNone(result_key(int_range, {"m": Config(1)}))
+
+    def test_array_key(self):
+        a = np.arange(10000.0)
+        b = a.copy()
+        b[5000:] *= -20
+        self.assertNotEqual(result_key(int_range, {"x": a}), result_key(int_range, {"x": b}))
+        self.assertEqual(result_key(int_range, {"x": a}), result_key(int_range, {"x": a.copy()}))
+        self.assertIsNone(result_key(int_range, {"x": bytearray(b"x")}))
+        self.assertIsNone(result_key(int_scale, {}, ["x", None]))
+
+    def test_fingerprint(self):
+        vectorized = ReduceTask(np.add, int_range, vectorized=True)
+        self.assertEqual(task_fingerprint(vectorized), task_fingerprint(ReduceTask(np.add, int_range, vectorized=True)))
+        self.assertNotEqual(task_fingerprint(vectorized), task_fingerprint(ReduceTask(np.add, int_range)))
+        self.assertNotEqual(task_fingerprint(vectorized),
+                            task_fingerprint(ReduceTask(np.add, int_range, vectorized=True, batch_size=10)))
+        self.assertNotEqual(task_fingerprint(vectorized), task_fingerprint(ReduceTask(np.multiply, int_range,
+                                                                                       vectorized=True)))
+
+    def test_put_get(self):
+        self.assertNotIn("a", self.cache)
+        self.assertEqual(1, self.cache.put("a", 1))
+        self.assertIn("a", self.cache)
+        self.assertEqual(1, self.cache.get("a"))
+        self.assertListEqual([0, 1, 2], list(self.cache.put("b", iter(range(3)))))
+        self.assertListEqual([0, 1, 2], list(self.cache.get("b")))
+        with self.assertRaises(KeyError):
+            self.cache.get("c")
+
+    def test_eviction(self):
+        cache = ResultCache(self.directory.name, max_size=200)
+        for key in "abcde":
+            cache.put(key, b"x" * 60)
+        self.assertNotIn("a", cache)
+        self.assertIn("e", cache)
+
+    def test_runner(self):
+        for runner in [SimpleRunner(cache=self.cache), ThreadingRunner(cache=self.cache)]:
+            with self.subTest(runner=runner.__class__.__name__):
+                self.cache.clear()
+                task_master = TaskMaster(runner)
+                calls.clear()
+                self.assertEqual(450, task_master.execute({}, cached_sum, cached_workspace).data)
+                self.assertEqual(3, len(calls))
+
+                calls.clear()
+                self.assertEqual(450, task_master.execute({}, cached_sum, cached_workspace).data)
+                self.assertListEqual([], calls)
+
+                calls.clear()
+                meta = {"cached_range": {"stop": 5}}
+                self.assertEqual(100, task_master.execute(meta, cached_sum, cached_workspace).data)
+                self.assertListEqual(["cached_range", "cached_sum"], calls)
+
+    def test_not_cacheable(self):
+        task_master = TaskMaster(SimpleRunner(cache=self.cache))
+        meta = {"cached_range": {"stop": 5, "tag": bytearray(b"x")}}
+        self.assertEqual(100, task_master.execute(meta, cached_sum, cached_workspace).data)
+        calls.clear()
+        self.assertEqual(100, task_master.execute(meta, cached_sum, cached_workspace).data)
+        self.assertListEqual(["cached_range", "cached_sum"], calls)
+
+
+class MemoryCacheTest(TestCase):
+
+    def test_sizeof(self):
+        self.assertGreaterEqual(sizeof(np.zeros(1000)), 8000)
+        self.assertGreater(sizeof([b"x" * 1000]), 1000)
+        self.assertGreater(sizeof({"a": "x" * 1000}), 1000)
+
+    def test_counters(self):
+        cache = MemoryCache()
+        cache.put("a", 1)
+        self.assertEqual(1, cache.get("a"))
+        with self.assertRaises(KeyError):
+            cache.get("b")
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_lru(self):
+        item = sizeof(b"x" * 100)
+        cache = MemoryCache(3 * item)
+        for key in "abc":
+            cache.put(key, b"x" * 100)
+        cache.get("a")
+        cache.put("d", b"x" * 100)
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertLessEqual(cache.size, cache.max_size)
+
+    def test_lfu(self):
+        item = sizeof(b"x" * 100)
+        cache = MemoryCache(3 * item, EvictionPolicy.LFU)
+        for key in "abc":
+            cache.put(key, b"x" * 100)
+        for key in "aab":
+            cache.get(key)
+        cache.put("d", b"x" * 100)
+        self.assertNotIn("c", cache)
+        self.assertIn("a", cache)
+        self.assertIn("b", cache)
+
+    def test_too_large(self):
+        cache = MemoryCache(10)
+        self.assertEqual(b"x" * 100, cache.put("a", b"x" * 100))
+        self.assertNotIn("a", cache)
+
+    def test_runner(self):
+        cache = MemoryCache()
+        task_master = TaskMaster(SimpleRunner(cache=cache))
+        calls.clear()
+        for _ in range(3):
+            self.assertEqual(450, task_master.execute({}, cached_sum, cached_workspace).data)
+        self.assertEqual(3, len(calls))
+        self.assertEqual(2, cache.hits)
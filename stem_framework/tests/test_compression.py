@@ -0,0 +1,139 @@
+import asyncio
+import io
+import os
+from unittest import TestCase
+
+from stem.compression import COMPRESSION_KEY, SIZE_KEY, PIECE_SIZE, compress, decompress_chunks, \
+    decompress_into, worth_compressing
+from stem.envelope import Envelope, EnvelopeReader, FRAME, _HEADER
+from stem.meta_codec import JSON, JsonCodec
+
+
+class TestCompression(TestCase):
+
+    def setUp(self) -> None:
+        self.data = b"stem framework " * 10000
+
+    def test_roundtrip(self):
+        for name in ("zlib", "lzma", "bz2"):
+            with self.subTest(name):
+                pieces = compress(memoryview(self.data), name)
+                self.assertLess(sum(map(len, pieces)), len(self.data))
+                self.assertEqual(self.data, decompress_into(pieces, name, memoryview(bytearray(len(self.data)))))
+
+    def test_worth_compressing(self):
+        self.assertTrue(worth_compressing(memoryview(self.data)))
+        self.assertFalse(worth_compressing(memoryview(b"small")))
+        self.assertFalse(worth_compressing(memoryview(os.urandom(100000))))
+
+    def test_declared_size(self):
+        pieces = compress(memoryview(self.data), "zlib")
+        with self.assertRaises(ValueError):
+            decompress_into(pieces, "zlib", memoryview(bytearray(100)))
+        with self.assertRaises(ValueError):
+            decompress_into(pieces, "zlib", memoryview(bytearray(len(self.data) + 1)))
+        with self.assertRaises(ValueError):
+            decompress_into(pieces[:-1], "zlib", memoryview(bytearray(len(self.data))))
+
+    def test_bounded_pieces(self):
+        zeros = bytes(10 * PIECE_SIZE)
+        pieces = list(decompress_chunks(compress(memoryview(zeros), "bz2"), "bz2"))
+        self.assertTrue(all(piece.nbytes <= PIECE_SIZE for piece in pieces))
+        self.assertEqual(zeros, b"".join(pieces))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            compress(memoryview(self.data), "zip")
+
+
+class TestCompressedEnvelope(TestCase):
+
+    def setUp(self) -> None:
+        self.data = b"stem framework " * 10000
+
+    def test_read(self):
+        for name in ("zlib", "lzma", "bz2"):
+            with self.subTest(name):
+                sent = Envelope(dict(a=1), self.data, compression=name)
+                raw = sent.to_bytes()
+                self.assertLess(len(raw), len(self.data))
+                self.assertDictEqual(dict(a=1), sent.meta)
+                envelope = Envelope.read(io.BytesIO(raw))
+                self.assertDictEqual(dict(a=1), envelope.meta)
+                self.assertEqual(name, envelope.compression)
+                self.assertEqual(self.data, envelope.data)
+                self.assertEqual(self.data, Envelope.from_bytes(raw).data)
+
+    def test_incompressible(self):
+        data = os.urandom(100000)
+        raw = Envelope(dict(a=1), data, compression="zlib").to_bytes()
+        self.assertNotIn(COMPRESSION_KEY.encode(), raw[:100])
+        envelope = Envelope.from_bytes(raw)
+        self.assertIsNone(envelope.compression)
+        self.assertEqual(data, envelope.data)
+
+    def test_expanding_frame(self):
+        pieces = compress(memoryview(bytes(10 * PIECE_SIZE)), "zlib")
+        meta = JsonCodec().encode({"a": 1, COMPRESSION_KEY: "zlib", SIZE_KEY: 1000})
+        data = b"".join(pieces)
+        raw = _HEADER.pack(b"#~", FRAME, JSON, len(meta), len(data), b"~#\r\n") + meta + data
+        self.assertRaises(ValueError, Envelope.from_bytes, raw)
+        self.assertRaises(ValueError, Envelope.read, io.BytesIO(raw))
+
+    def test_stream_sample(self):
+        chunks = [b"", os.urandom(10), self.data]
+        raw = Envelope(dict(a=1), iter(chunks), compression="zlib").to_bytes()
+        self.assertLess(len(raw), len(self.data))
+        self.assertEqual(b"".join(chunks), b"".join(Envelope.from_bytes(raw).data))
+        raw = Envelope(dict(a=1), iter([os.urandom(100000), self.data]), compression="zlib").to_bytes()
+        self.assertIsNone(Envelope.from_bytes(raw).compression)
+
+    def test_stream(self):
+        chunks = [self.data, b"", self.data[:100]]
+        output = io.BytesIO()
+        Envelope(dict(a=1), iter(chunks), compression="bz2").write_to(output)
+        Envelope(dict(b=2), b"next").write_to(output)
+        self.assertLess(len(output.getvalue()), len(self.data))
+        input = io.BytesIO(output.getvalue())
+        envelope = Envelope.read(input)
+        self.assertEqual("bz2", envelope.compression)
+        self.assertEqual(b"".join(chunks), b"".join(envelope.data))
+        self.assertEqual(b"next", Envelope.read(input).data)
+
+    def test_async_read(self):
+        async def read() -> list[bytes]:
+            reader = asyncio.StreamReader()
+            reader.feed_data(Envelope(dict(a=1), self.data, compression="zlib").to_bytes() +
+                             Envelope(dict(a=1), iter([self.data]), compression="lzma").to_bytes())
+            reader.feed_eof()
+            envelope_reader = EnvelopeReader(reader, chunk_size=1000)
+            frame = await envelope_reader.read()
+            self.assertLess(len(envelope_reader._buffer), 1000)
+            stream = await envelope_reader.read()
+            return [bytes(frame.data), b"".join([bytes(chunk) async for chunk in stream.data])]
+
+        self.assertEqual([self.data, self.data], asyncio.run(read()))
+
+    def test_async_write(self):
+        async def chunks():
+            yield self.data
+            yield self.data
+
+        async def roundtrip() -> bytes:
+            received = []
+
+            async def handle(reader, writer):
+                envelope = await Envelope.async_read(reader)
+                received.extend([bytes(chunk) async for chunk in envelope.data])
+                writer.close()
+
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                await Envelope(dict(a=1), chunks(), compression="zlib").async_write_to(writer)
+                await reader.read()
+                writer.close()
+                await writer.wait_closed()
+            return b"".join(received)
+
+        self.assertEqual(self.data * 2, asyncio.run(roundtrip()))
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from benchmarks.synthetic import synthetic_workspace
+from stem.cost import CostModel
+from stem.memory import MemoryMonitor
+from stem.meta import Meta
+from stem.task import data, task
+from stem.task_master import TaskMaster
+from stem.task_runner import ThreadingRunner, SimpleRunner, AsyncRunner, _plan, _priorities
+from stem.task_tree import TaskNode
+from stem.workspace import LocalWorkspace
+from tests.example_task import int_reduce, int_sum
+
+started = []
+
+
+@data
+def cost_short(meta: Meta) -> int:
+    started.append("cost_short")
+    time.sleep(0.01)
+    return 1
+
+
+@data
+def cost_long(meta: Meta) -> int:
+    started.append("cost_long")
+    time.sleep(0.05)
+    return 2
+
+
+@task
+def cost_top(meta: Meta, cost_short: int, cost_long: int) -> int:
+    return cost_short + cost_long
+
+
+cost_workspace = LocalWorkspace("cost", {t.name: t for t in [cost_short, cost_long, cost_top]})
+
+
+class CostModelTest(TestCase):
+
+    def test_observe(self):
+        model = CostModel()
+        model.observe("a", {"x": 1}, 1.0)
+        model.observe("a", {"x": 1}, 3.0)
+        model.observe("a", {"x": 2}, 4.0)
+        self.assertEqual(2.0, model.cost("a", {"x": 1}))
+        self.assertEqual(3.0, model.cost("a", {"x": 3}))
+        self.assertEqual(CostModel.DEFAULT, model.cost("b", {}))
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as path:
+            model = CostModel(os.path.join(path, "cost.json"))
+            model.observe("a", {}, 1.5)
+            model.save()
+            self.assertEqual(1.5, CostModel(os.path.join(path, "cost.json")).cost("a", {}))
+
+    def test_critical_path_first(self):
+        model = CostModel()
+        TaskMaster(SimpleRunner(cost_model=model)).execute({}, cost_top, cost_workspace).data
+        started.clear()
+        result = TaskMaster(ThreadingRunner(max_workers=1, cost_model=model)).execute({}, cost_top, cost_workspace)
+        self.assertEqual(3, result.data)
+        self.assertEqual(["cost_long", "cost_short"], started)
+
+    def test_async_task(self):
+        model = CostModel(default=-1.0)
+        memory = MemoryMonitor(trace_malloc=True)
+        result = TaskMaster(AsyncRunner(cost_model=model, memory=memory)).execute({}, int_sum)
+        self.assertEqual(sum(range(10)), result.data)
+        self.assertGreaterEqual(model.cost("int_sum", {}), 0.0)
+        self.assertIn("int_sum", memory.report()["tasks"])
+
+    def test_priorities(self):
+        workspace = synthetic_workspace("COST", width=2, depth=2, fan_in=1)
+        jobs, _ = _plan([{}], TaskNode(workspace.find_task("root"), workspace))
+        model = CostModel(default=1.0)
+        priorities = _priorities(jobs, model)
+        self.assertEqual(3.0, priorities[jobs[0]])
+        self.assertEqual(1.0, priorities[jobs[-1]])
+
+    def test_estimate(self):
+        model = CostModel(default=1.0)
+        estimate = TaskMaster(SimpleRunner()).estimate({}, int_reduce, cost_model=model)
+        self.assertEqual(4.0, estimate.total)
+        self.assertEqual(3.0, estimate.critical_path)
+        self.assertEqual(3.0, estimate.for_workers(2))
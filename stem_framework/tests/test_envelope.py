@@ -1,7 +1,30 @@
+import asyncio
 import io
+import mmap
+import os
+import socket
+import tempfile
+from threading import Thread
 from unittest import TestCase
 
-from stem.envelope import Envelope
+from stem.envelope import Envelope, EnvelopeReader, _sendmsg, _IOV_MAX
+
+
+class _Trickle(io.RawIOBase):
+    """
+    Stream which returns at most 3 bytes per read
+    """
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        chunk = self._data.read(min(3, len(buffer)))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
 
 
 class TestEnvelope(TestCase):
@@ -15,3 +38,253 @@ class TestEnvelope(TestCase):
         envelope = Envelope.from_bytes(data)
         self.assertDictEqual(self.envelope.meta, envelope.meta)
         self.assertEqual(self.envelope.data, envelope.data)
+
+    def test_buffers(self):
+        header, meta, data = self.envelope.buffers()
+        self.assertEqual(20, len(header))
+        self.assertIs(self.data, data.obj)
+        self.assertEqual(self.envelope.to_bytes(), bytes(header) + bytes(meta) + bytes(data))
+
+    def test_short_reads(self):
+        envelope = Envelope.read(_Trickle(self.envelope.to_bytes()))
+        self.assertDictEqual(self.envelope.meta, envelope.meta)
+        self.assertEqual(self.data, envelope.data)
+
+    def test_truncated(self):
+        self.assertRaises(EOFError, Envelope.read, io.BytesIO(self.envelope.to_bytes()[:-1]))
+
+    def test_write_to(self):
+        output = io.BytesIO()
+        self.envelope.write_to(output)
+        self.assertEqual(self.envelope.to_bytes(), output.getvalue())
+
+    def test_sendmsg(self):
+        envelope = Envelope(dict(a=1), bytes(range(256)) * 4096)
+        left, right = socket.socketpair()
+        with left, right:
+            writer = Thread(target=envelope.write_to, args=(left,))
+            writer.start()
+            with right.makefile("rb") as f:
+                received = Envelope.read(f)
+            writer.join()
+        self.assertEqual(envelope.data, received.data)
+
+    def test_sendmsg_batches(self):
+        class Partial:
+            def __init__(self):
+                self.sent = bytearray()
+
+            def sendmsg(self, buffers):
+                assert len(buffers) <= _IOV_MAX
+                data = b"".join(buffers)[:_IOV_MAX + 7]
+                self.sent += data
+                return len(data)
+
+        buffers = [memoryview(bytes([i % 256]) * 3) for i in range(_IOV_MAX + 76)]
+        expected = b"".join(buffers)
+        sock = Partial()
+        _sendmsg(sock, list(buffers))
+        self.assertEqual(expected, sock.sent)
+
+        left, right = socket.socketpair()
+        with left, right:
+            writer = Thread(target=_sendmsg, args=(left, list(buffers)))
+            writer.start()
+            with right.makefile("rb") as f:
+                received = f.read(len(expected))
+            writer.join()
+        self.assertEqual(expected, received)
+
+    def test_async_read(self):
+        async def read(frames: bytes) -> list[Envelope]:
+            reader = asyncio.StreamReader()
+            reader.feed_data(frames)
+            reader.feed_eof()
+            envelope_reader = EnvelopeReader(reader, chunk_size=3)
+            first = await envelope_reader.read()
+            first = Envelope(first.meta, bytes(first.data))
+            return [first, await envelope_reader.read()]
+
+        other = Envelope({"quote": "it's"}, b"abc")
+        first, second = asyncio.run(read(self.envelope.to_bytes() + other.to_bytes()))
+        self.assertDictEqual(self.envelope.meta, first.meta)
+        self.assertEqual(self.data, first.data)
+        self.assertDictEqual(other.meta, second.meta)
+        self.assertIsInstance(second.data, memoryview)
+        self.assertEqual(b"abc", second.data)
+
+    def test_async_read_reuses_reader(self):
+        async def read() -> tuple[list[Envelope], EnvelopeReader]:
+            reader = asyncio.StreamReader()
+            reader.feed_data(self.envelope.to_bytes() * 2)
+            reader.feed_eof()
+            return [await Envelope.async_read(reader), await Envelope.async_read(reader)], EnvelopeReader.of(reader)
+
+        (first, second), envelope_reader = asyncio.run(read())
+        self.assertIs(first.data.obj, second.data.obj)
+        self.assertIs(envelope_reader._buffer, second.data.obj)
+        self.assertEqual(self.data, second.data)
+
+    def test_async_truncated(self):
+        async def read() -> Envelope:
+            reader = asyncio.StreamReader()
+            reader.feed_data(self.envelope.to_bytes()[:-1])
+            reader.feed_eof()
+            return await Envelope.async_read(reader)
+
+        self.assertRaises(EOFError, asyncio.run, read())
+
+
+class TestLargeEnvelope(TestCase):
+
+    def setUp(self) -> None:
+        self.max_size = Envelope._MAX_SIZE
+        Envelope._MAX_SIZE = 16
+        self.envelope = Envelope(dict(a=1), bytes(range(256)) * 16)
+
+    def tearDown(self) -> None:
+        Envelope._MAX_SIZE = self.max_size
+        Envelope.TEMP_DIR = None
+
+    def test_read_stream(self):
+        envelope = Envelope.read(_Trickle(self.envelope.to_bytes()))
+        self.assertIsInstance(envelope.data.obj, mmap.mmap)
+        self.assertEqual(self.envelope.data, envelope.data)
+        with tempfile.TemporaryDirectory() as path:
+            Envelope.TEMP_DIR = path
+            envelope = Envelope.read(_Trickle(self.envelope.to_bytes()))
+            self.assertEqual(self.envelope.data, envelope.data)
+
+    def test_read_file(self):
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path, "frames"), "wb") as f:
+                self.envelope.write_to(f)
+                self.envelope.write_to(f)
+            with open(os.path.join(path, "frames"), "rb") as f:
+                envelopes = [Envelope.read(f), Envelope.read(f)]
+            for envelope in envelopes:
+                self.assertIsInstance(envelope.data.obj, mmap.mmap)
+                self.assertEqual(self.envelope.data, envelope.data)
+
+    def test_sendmsg_batches(self):
+        class Partial:
+            def __init__(self):
+                self.sent = bytearray()
+
+            def sendmsg(self, buffers):
+                assert len(buffers) <= _IOV_MAX
+                data = b"".join(buffers)[:_IOV_MAX + 7]
+                self.sent += data
+                return len(data)
+
+        buffers = [memoryview(bytes([i % 256]) * 3) for i in range(_IOV_MAX + 76)]
+        expected = b"".join(buffers)
+        sock = Partial()
+        _sendmsg(sock, list(buffers))
+        self.assertEqual(expected, sock.sent)
+
+        left, right = socket.socketpair()
+        with left, right:
+            writer = Thread(target=_sendmsg, args=(left, list(buffers)))
+            writer.start()
+            with right.makefile("rb") as f:
+                received = f.read(len(expected))
+            writer.join()
+        self.assertEqual(expected, received)
+
+    def test_async_read(self):
+        async def read() -> Envelope:
+            reader = asyncio.StreamReader()
+            reader.feed_data(self.envelope.to_bytes())
+            reader.feed_eof()
+            return await Envelope.async_read(reader)
+
+        envelope = asyncio.run(read())
+        self.assertIsInstance(envelope.data.obj, mmap.mmap)
+        self.assertEqual(self.envelope.data, envelope.data)
+
+
+class TestStreamEnvelope(TestCase):
+
+    def setUp(self) -> None:
+        self.chunks = [b"abc", b"", bytes(range(100)), b"z"]
+
+    def _envelope(self) -> Envelope:
+        return Envelope(dict(a=1), (chunk for chunk in self.chunks))
+
+    def test_from_bytes(self):
+        envelope = Envelope.from_bytes(self._envelope().to_bytes())
+        self.assertTrue(envelope.is_stream)
+        self.assertEqual([c for c in self.chunks if c], [bytes(c) for c in envelope.data])
+
+    def test_read(self):
+        output = io.BytesIO()
+        self._envelope().write_to(output)
+        Envelope(dict(b=2), b"next").write_to(output)
+        input = _Trickle(output.getvalue())
+        envelope = Envelope.read(input)
+        self.assertEqual(b"".join(self.chunks), b"".join(envelope.data))
+        self.assertEqual(b"next", Envelope.read(input).data)
+
+    def test_sendmsg_batches(self):
+        class Partial:
+            def __init__(self):
+                self.sent = bytearray()
+
+            def sendmsg(self, buffers):
+                assert len(buffers) <= _IOV_MAX
+                data = b"".join(buffers)[:_IOV_MAX + 7]
+                self.sent += data
+                return len(data)
+
+        buffers = [memoryview(bytes([i % 256]) * 3) for i in range(_IOV_MAX + 76)]
+        expected = b"".join(buffers)
+        sock = Partial()
+        _sendmsg(sock, list(buffers))
+        self.assertEqual(expected, sock.sent)
+
+        left, right = socket.socketpair()
+        with left, right:
+            writer = Thread(target=_sendmsg, args=(left, list(buffers)))
+            writer.start()
+            with right.makefile("rb") as f:
+                received = f.read(len(expected))
+            writer.join()
+        self.assertEqual(expected, received)
+
+    def test_async_read(self):
+        async def read() -> list[bytes]:
+            reader = asyncio.StreamReader()
+            reader.feed_data(self._envelope().to_bytes() + Envelope(dict(b=2), b"next").to_bytes())
+            reader.feed_eof()
+            envelope_reader = EnvelopeReader(reader)
+            envelope = await envelope_reader.read()
+            chunks = [bytes(chunk) async for chunk in envelope.data]
+            following = await envelope_reader.read()
+            return chunks + [bytes(following.data)]
+
+        self.assertEqual([c for c in self.chunks if c] + [b"next"], asyncio.run(read()))
+
+    def test_async_write(self):
+        async def chunks():
+            for chunk in self.chunks:
+                yield chunk
+
+        async def roundtrip() -> bytes:
+            received = []
+
+            async def handle(reader, writer):
+                envelope = await Envelope.async_read(reader)
+                received.extend([bytes(chunk) async for chunk in envelope.data])
+                writer.close()
+
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                await Envelope(dict(a=1), chunks()).async_write_to(writer)
+                await reader.read()
+                writer.close()
+                await writer.wait_closed()
+            return b"".join(received)
+
+        self.assertEqual(b"".join(self.chunks), asyncio.run(roundtrip()))
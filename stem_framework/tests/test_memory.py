@@ -0,0 +1,103 @@
+import os
+import tracemalloc
+from threading import Thread
+from typing import Iterator
+from unittest import TestCase
+
+import numpy as np
+
+from stem.memory import MemoryMonitor
+from stem.meta import Meta
+from stem.task import data, task
+from stem.task_master import TaskMaster
+from stem.task_runner import SimpleRunner, ThreadingRunner, AsyncRunner, StreamingRunner, _Job
+from stem.task_tree import TaskNode
+from stem.workspace import LocalWorkspace
+
+
+@data
+def big_array(meta: Meta) -> np.ndarray:
+    return np.arange(100_000, dtype="f8")
+
+
+@data
+def big_list(meta: Meta) -> list[int]:
+    return list(range(10_000))
+
+
+@task
+def big_sum(meta: Meta, big_array: np.ndarray, big_list: list[int]) -> float:
+    return float(big_array.sum()) + sum(big_list)
+
+
+@task
+def big_head(meta: Meta, big_array: np.ndarray) -> Iterator[float]:
+    return iter(big_array[:10].tolist())
+
+
+@task
+def big_head_sum(meta: Meta, big_head: Iterator[float]) -> float:
+    return sum(big_head)
+
+
+memory_workspace = LocalWorkspace("memory", {t.name: t for t in [big_array, big_list, big_sum, big_head,
+                                                                  big_head_sum]})
+
+expected = float(np.arange(100_000).sum()) + sum(range(10_000))
+
+
+class MemoryMonitorTest(TestCase):
+
+    def test_peak(self):
+        memory = MemoryMonitor()
+        result = TaskMaster(SimpleRunner(memory=memory)).execute({}, big_sum, memory_workspace)
+        self.assertEqual(expected, result.data)
+        self.assertGreaterEqual(memory.peak, 800_000)
+        self.assertEqual(0, memory.held)
+
+    def test_trace_malloc(self):
+        memory = MemoryMonitor(trace_malloc=True)
+        TaskMaster(SimpleRunner(memory=memory)).execute({}, big_sum, memory_workspace).data
+        self.assertGreaterEqual(memory.report()["tasks"]["big_array"], 800_000)
+        self.assertGreaterEqual(memory.allocated_peak, 800_000)
+        self.assertFalse(tracemalloc.is_tracing())
+        memory = MemoryMonitor(trace_malloc=True)
+        TaskMaster(ThreadingRunner(memory=memory)).execute({}, big_sum, memory_workspace).data
+        self.assertTrue(all(record.allocated >= 0 for record in memory.records if record.allocated is not None))
+        self.assertFalse(tracemalloc.is_tracing())
+        tracemalloc.start()
+        try:
+            memory.measure("traced", sum, [1, 2])
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+    def test_spill(self):
+        for runner in [SimpleRunner, ThreadingRunner, AsyncRunner, StreamingRunner]:
+            with self.subTest(runner=runner.__name__):
+                memory = MemoryMonitor(budget=100_000)
+                result = TaskMaster(runner(memory=memory)).execute({}, big_sum, memory_workspace)
+                self.assertEqual(expected, result.data)
+                self.assertEqual(2, memory.report()["spilled"])
+                self.assertEqual([], os.listdir(memory._own_dir))
+                memory.close()
+
+    def test_streaming_release(self):
+        memory = MemoryMonitor()
+        result = TaskMaster(StreamingRunner(memory=memory)).execute({}, big_head_sum, memory_workspace)
+        self.assertEqual(45, result.data)
+        self.assertGreaterEqual(memory.peak, 800_000)
+        self.assertEqual(0, memory.held)
+
+    def test_concurrent_release(self):
+        memory = MemoryMonitor()
+        job = _Job(TaskNode(big_list, memory_workspace), {}, memory=memory)
+        job.dependants = [None] * 1000
+        job.set_result(list(range(1000)))
+        threads = [Thread(target=lambda: [job._consumed() for _ in range(100)]) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIsNone(job.result)
+        self.assertEqual(0, memory.held)
@@ -1,7 +1,8 @@
 import dataclasses
 from unittest import TestCase
 
-from stem.meta import MetaVerification, update_meta, get_meta_attr
+from stem.meta import MetaVerification, update_meta, get_meta_attr, compile_specification, SpecificationError, \
+    meta_key, IdentityKey
 
 
 @dataclasses.dataclass
@@ -44,3 +45,40 @@ class CoreTest(TestCase):
 
         verification = MetaVerification.verify(example_dict, specification)
         self.assertFalse(verification.checked_success)
+
+    def test_verify_nested(self):
+        specification = (("a", int), ("sub", (("b", float), ("c", (int, str)))))
+        self.assertTrue(MetaVerification.verify({"a": 1, "sub": {"b": 1.0, "c": "c"}}, specification).checked_success)
+        verification = MetaVerification.verify({"a": 1, "sub": {"b": 1.0, "c": 1.0}}, specification)
+        self.assertFalse(verification.checked_success)
+        self.assertEqual("c", verification.error[0].error[0].required_key)
+
+    def test_verify_many(self):
+        metas = [{"a": i, "b": 0.5, "c": []} for i in range(100)] + [{"a": "a", "b": 0.5, "c": []}]
+        verifications = MetaVerification.verify_many(metas, Example)
+        self.assertEqual(101, len(verifications))
+        self.assertTrue(all(v.checked_success for v in verifications[:100]))
+        self.assertFalse(verifications[100].checked_success)
+        self.assertIs(str, verifications[100].error[0].presented_type)
+
+    def test_compile_specification(self):
+        specification = (("a", int), ("b", (int, float)))
+        self.assertIs(compile_specification(specification), compile_specification(specification))
+        self.assertIs(compile_specification(Example), compile_specification(Example))
+        with self.assertRaises(SpecificationError):
+            compile_specification(("a", "int"))
+
+    def test_meta_key(self):
+        import numpy as np
+
+        a = np.arange(10000)
+        b = a.copy()
+        b[5000] = -1
+        self.assertEqual(meta_key({"x": a}), meta_key({"x": a.copy()}))
+        self.assertNotEqual(meta_key({"x": a}), meta_key({"x": b}))
+        self.assertNotEqual(meta_key({"x": a}), meta_key({"x": a.astype(float)}))
+        self.assertNotEqual(meta_key({"x": a}), meta_key({"x": a.reshape(100, 100)}))
+        c, d = bytearray(b"c"), bytearray(b"c")
+        self.assertIsInstance(meta_key(c), IdentityKey)
+        self.assertEqual(meta_key({"x": c}), meta_key({"x": c}))
+        self.assertNotEqual(meta_key({"x": c}), meta_key({"x": d}))
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from unittest import TestCase
+
+from stem.envelope import Envelope
+from stem.meta_codec import BINARY, JSON, BinaryCodec, MetaCodec, get_codec, register_codec
+
+
+@dataclass
+class Point:
+    x: int
+    y: float
+
+
+class MetaCodecTest(TestCase):
+    meta = {
+        "command": "run", "none": None, "flags": [True, False], "small": -5, "int": 2 ** 40, "big": 2 ** 70,
+        "float": 1.5, "ints": [1, 300, -70000, 2 ** 40], "floats": [0.5, 1.0], "strs": ["a", "ü" * 300],
+        "long": "x" * 1000, "bytes": b"\x00\x01", "nested": {"a": [1, "b", {"c": []}]}, "": [],
+    }
+
+    def test_binary(self):
+        codec = BinaryCodec()
+        self.assertEqual(self.meta, codec.decode(memoryview(codec.encode(self.meta))))
+        nested = {"strs": ["ü" * 300, "a"], "lists": [[]] * 300, "dicts": {str(i): {} for i in range(300)}}
+        self.assertEqual(nested, codec.decode(memoryview(codec.encode(nested))))
+        command = {"command": "powerfullity"}
+        self.assertLess(len(codec.encode(command)), len(get_codec(JSON).encode(command)))
+
+    def test_dataclass(self):
+        for meta_type in (JSON, BINARY):
+            codec = get_codec(meta_type)
+            self.assertEqual({"p": {"x": 1, "y": 2.0}},
+                             codec.decode(memoryview(codec.encode({"p": Point(1, 2.0)}))))
+
+    def test_envelope(self):
+        meta = {"command": "run", "int_range": {"stop": 10}, "ints": list(range(10))}
+        envelope = Envelope.from_bytes(Envelope(meta, b"data", BINARY).to_bytes())
+        self.assertEqual(BINARY, envelope.meta_type)
+        self.assertEqual(meta, envelope.meta)
+        self.assertEqual(b"data", envelope.data)
+
+    def test_registry(self):
+        class Upper(MetaCodec):
+            def encode(self, meta):
+                return meta.upper().encode()
+
+            def decode(self, buffer):
+                return str(buffer, "utf-8").lower()
+
+        register_codec(b"UP", Upper())
+        self.assertEqual("meta", Envelope.from_bytes(Envelope("meta", meta_type=b"UP").to_bytes()).meta)
+        self.assertRaises(ValueError, get_codec, b"??")
+        self.assertRaises(ValueError, register_codec, b"UPPER", Upper())
+
+    def test_incomplete(self):
+        class EncodeOnly(MetaCodec):
+            def encode(self, meta):
+                return b""
+
+        self.assertRaises(TypeError, EncodeOnly)
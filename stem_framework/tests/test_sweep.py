@@ -0,0 +1,60 @@
+import os
+import tempfile
+from unittest import TestCase, skipUnless
+from importlib.util import find_spec
+
+import numpy as np
+
+from stem.meta import Meta
+from stem.sweep import Grid, RandomSample, Sweep, set_meta_path
+from stem.task import task
+from tests.example_task import int_reduce
+
+
+@task
+def sweep_fail(meta: Meta) -> int:
+    if meta["x"] == 2:
+        raise ValueError("bad point")
+    return meta["x"]
+
+
+class SweepTest(TestCase):
+
+    def test_set_meta_path(self):
+        meta = {"a": 1}
+        set_meta_path(meta, "int_range.stop", 5)
+        self.assertEqual({"a": 1, "int_range": {"stop": 5}}, meta)
+
+    def test_grid(self):
+        grid = Grid(int_range__start=[0, 1], int_range__stop=[3, 4, 5])
+        self.assertEqual((2, 3), grid.shape)
+        self.assertEqual(6, len(list(grid)))
+        self.assertEqual({"int_range.start": 1, "int_range.stop": 3}, list(grid)[3])
+
+    def test_random_sample(self):
+        sample = RandomSample(8, seed=1, int_range__stop=range(5, 10), x=lambda rng: rng.uniform())
+        self.assertEqual(8, len(list(sample)))
+        self.assertTrue(all(5 <= p["int_range.stop"] < 10 for p in sample))
+
+    def test_sweep(self):
+        grid = Grid(**{"int_scale.int_range.start": [0, 1], "int_scale.int_range.stop": [3, 4, 5]})
+        result = Sweep(int_reduce, grid, max_workers=2, shard_size=2).run()
+        expected = [[10 * sum(range(start, stop)) for stop in [3, 4, 5]] for start in [0, 1]]
+        np.testing.assert_array_equal(expected, result.values)
+        np.testing.assert_array_equal([0, 1], result.coordinates["int_scale.int_range.start"])
+
+    def test_sweep_errors(self):
+        result = Sweep(sweep_fail, Grid(x=[1, 2, 3])).run()
+        self.assertEqual([1], list(result.errors))
+        self.assertTrue(np.isnan(result.values[1]))
+        self.assertEqual(3, result.values[2])
+
+    @skipUnless(find_spec("h5py"), "h5py is not installed")
+    def test_to_hdf5(self):
+        import h5py
+
+        result = Sweep(sweep_fail, Grid(x=[1, 3])).run()
+        with tempfile.TemporaryDirectory() as path:
+            result.to_hdf5(os.path.join(path, "sweep.h5"))
+            with h5py.File(os.path.join(path, "sweep.h5")) as f:
+                np.testing.assert_array_equal([1, 3], f["sweep/values"])
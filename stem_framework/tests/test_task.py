@@ -1,8 +1,10 @@
 from functools import reduce
 from unittest import TestCase
 
-from stem.task import Task, MapTask, FilterTask, ReduceTask
-from tests.example_task import IntRange, int_range, int_scale, data_scale
+import numpy as np
+
+from stem.task import Task, MapTask, FilterTask, ReduceTask, batches
+from tests.example_task import IntRange, int_range, int_scale, data_scale, int_sum, float_batches
 
 
 class TaskTest(TestCase):
@@ -28,6 +30,12 @@ class TaskTest(TestCase):
                         int_scale.transform({}, int_range=int_range.data({}), data_scale=data_scale.data({}))):
             self.assertEqual(i, r)
 
+    def test_is_async(self):
+        self.assertTrue(int_sum.is_async)
+        self.assertFalse(int_scale.is_async)
+        self.assertFalse(int_range.is_async)
+        self.assertFalse(IntRange().is_async)
+
     def test_map_task(self):
         task = MapTask(lambda x: x * 10, int_range)
         self.assertEqual(task.name, "map_int_range")
@@ -46,4 +54,25 @@ class TaskTest(TestCase):
         self.assertEqual(reduce(lambda acc, x: acc + x, range(0, 10, 1)),
                          task.transform({}, int_range=int_range.data({})))
 
+    def test_batches(self):
+        for source in [range(10), np.arange(10), iter([np.arange(4), np.arange(4, 8), 8, 9])]:
+            with self.subTest(source=source):
+                result = list(batches(source, 4))
+                self.assertListEqual([4, 4, 2], [len(b) for b in result])
+                np.testing.assert_array_equal(np.arange(10), np.concatenate(result))
+
+    def test_vectorized_map_task(self):
+        task = MapTask(lambda x: x * 10, int_range, vectorized=True, batch_size=3)
+        result = list(task.transform({}, int_range=int_range.data({})))
+        self.assertEqual(4, len(result))
+        np.testing.assert_array_equal(np.arange(0, 100, 10), np.concatenate(result))
+
+    def test_vectorized_filter_task(self):
+        task = FilterTask(lambda x: x % 2 == 0, float_batches, vectorized=True)
+        result = np.concatenate(list(task.transform({}, float_batches=float_batches.data({"stop": 10, "step": 1}))))
+        np.testing.assert_array_equal(np.arange(0, 10, 2), result)
 
+    def test_vectorized_reduce_task(self):
+        task = ReduceTask(np.add, float_batches, vectorized=True)
+        result = task.transform({}, float_batches=float_batches.data({"stop": 10, "step": 1}))
+        self.assertEqual(45, result)
@@ -1,10 +1,35 @@
 from unittest import TestCase
 
-from stem.task_master import TaskMaster
-from stem.task_runner import SimpleRunner
+from stem.meta import Meta
+from stem.task import data, task
+from stem.task_master import TaskMaster, TaskStatus
+from stem.task_runner import SimpleRunner, ThreadingRunner, AsyncRunner, ProcessingRunner, StreamingRunner
 from tests.example_task import int_scale
 
 
+loads = []
+
+
+@data
+def batch_source(meta: Meta) -> list[int]:
+    loads.append(1)
+    return list(range(5))
+
+
+def batch_scale(meta: Meta, batch_source: list[int]) -> list[int]:
+    if meta["k"] < 0:
+        raise ValueError("negative scale")
+    return [meta["k"] * x for x in batch_source]
+
+
+batch_scale = task(batch_scale, specification=(("k", int),))
+
+
+@task
+def array_sum(meta: Meta) -> float:
+    return float(meta["x"].sum())
+
+
 class SimpleRunnerTest(TestCase):
 
     def setUp(self) -> None:
@@ -14,4 +39,41 @@ class SimpleRunnerTest(TestCase):
         task_master = TaskMaster(self.runner)
         result = task_master.execute({}, int_scale)
         for i, r in zip(range(0, 100, 10), result.lazy_data()):
-            self.assertEqual(i, r)
\ No newline at end of file
+            self.assertEqual(i, r)
+
+
+class ExecuteManyTest(TestCase):
+    runners = [SimpleRunner, ThreadingRunner, AsyncRunner, ProcessingRunner, StreamingRunner]
+
+    def test_execute_many(self):
+        metas = [{"k": k} for k in range(4)]
+        for runner in self.runners:
+            with self.subTest(runner=runner.__name__):
+                results = list(TaskMaster(runner()).execute_many(metas, batch_scale))
+                self.assertEqual(len(metas), len(results))
+                for result in results:
+                    self.assertEqual(TaskStatus.CONTAINS_DATA, result.status)
+                    self.assertEqual([result.meta["k"] * x for x in range(5)], result.data)
+
+    def test_shared_dependency(self):
+        loads.clear()
+        results = TaskMaster(ThreadingRunner()).execute_many([{"k": k} for k in range(10)], batch_scale)
+        self.assertEqual(10, len(list(results)))
+        self.assertEqual(1, len(loads))
+
+    def test_errors(self):
+        metas = [{"k": 1}, {"k": "a"}, {"k": -1}]
+        results = {str(r.meta["k"]): r for r in TaskMaster(SimpleRunner()).execute_many(metas, batch_scale)}
+        self.assertEqual(TaskStatus.CONTAINS_DATA, results["1"].status)
+        self.assertEqual(TaskStatus.META_ERROR, results["a"].status)
+        self.assertEqual(TaskStatus.INVOCATION_ERROR, results["-1"].status)
+        self.assertRaises(Exception, lambda: results["-1"].data)
+
+    def test_array_metas(self):
+        import numpy as np
+
+        a = np.arange(10000.0)
+        b = a.copy()
+        b[5000:] *= -20
+        results = TaskMaster(SimpleRunner()).execute_many([{"x": a}, {"x": b}], array_sum)
+        self.assertEqual([a.sum(), b.sum()], [r.data for r in results])
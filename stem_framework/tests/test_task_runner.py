@@ -1,8 +1,89 @@
+import os
+import tempfile
+import threading
+import time
+from typing import Iterator
 from unittest import TestCase
 
+from stem.meta import Meta
+from stem.task import data, task
 from stem.task_master import TaskMaster
-from stem.task_runner import SimpleRunner, TaskRunner, ThreadingRunner, AsyncRunner, ProcessingRunner
-from tests.example_task import int_scale
+from stem.task_runner import SimpleRunner, TaskRunner, ThreadingRunner, AsyncRunner, ProcessingRunner, \
+    StreamingRunner
+from stem.workspace import LocalWorkspace
+from tests.example_task import int_scale, float_reduce, int_sum
+
+
+calls = []
+
+
+@data
+def diamond_source(meta: Meta) -> Iterator[int]:
+    calls.append("diamond_source")
+    return iter(range(5))
+
+
+@task
+def diamond_left(meta: Meta, diamond_source: Iterator[int]) -> int:
+    return sum(diamond_source)
+
+
+@task
+def diamond_right(meta: Meta, diamond_source: Iterator[int]) -> int:
+    return max(diamond_source)
+
+
+@task
+def diamond_top(meta: Meta, diamond_left: int, diamond_right: int) -> int:
+    return diamond_left * diamond_right
+
+
+diamond_workspace = LocalWorkspace("diamond", {
+    t.name: t for t in [diamond_source, diamond_left, diamond_right, diamond_top]
+})
+
+produced = []
+
+
+@data
+def stream_source(meta: Meta) -> Iterator[int]:
+    for i in range(1000):
+        produced.append(i)
+        yield i
+
+
+@task
+def stream_lead(meta: Meta, stream_source: Iterator[int]) -> int:
+    return max(len(produced) - i for i in stream_source)
+
+
+@task
+def stream_abort(meta: Meta, stream_source: Iterator[int]) -> int:
+    for i in stream_source:
+        if i == 10:
+            raise ValueError("abort")
+    return 0
+
+
+stream_workspace = LocalWorkspace("stream", {t.name: t for t in [stream_source, stream_lead, stream_abort]})
+
+
+@data
+def worker_source(meta: Meta) -> Iterator[int]:
+    yield os.getpid()
+    deadline = time.time() + 10
+    while not os.path.exists(meta["started"]) and time.time() < deadline:
+        time.sleep(0.01)
+    yield int(os.path.exists(meta["started"]))
+
+
+@task
+def worker_consumer(meta: Meta, worker_source: Iterator[int]) -> Iterator[int]:
+    for i, item in enumerate(worker_source):
+        if i == 0:
+            open(meta["worker_source"]["started"], "w").close()
+        yield item
+    yield os.getpid()
 
 
 class RunnerTest(TestCase):
@@ -21,10 +102,66 @@ class RunnerTest(TestCase):
         runner = ThreadingRunner()
         self._run(runner)
 
+    def test_threading_deep_tree(self):
+        expected = TaskMaster(SimpleRunner()).execute({}, float_reduce).data
+        result = TaskMaster(ThreadingRunner(max_workers=1)).execute({}, float_reduce)
+        self.assertAlmostEqual(expected, result.data, places=3)
+
     def test_async(self):
         runner = AsyncRunner()
         self._run(runner)
 
+    def test_async_task(self):
+        for runner in [SimpleRunner(), ThreadingRunner(), AsyncRunner()]:
+            with self.subTest(runner=runner.__class__.__name__):
+                self.assertEqual(sum(range(10)), TaskMaster(runner).execute({}, int_sum).data)
+
+    def test_shared_dependency(self):
+        for runner in [SimpleRunner(), ThreadingRunner(), AsyncRunner(), ProcessingRunner(), StreamingRunner()]:
+            with self.subTest(runner=runner.__class__.__name__):
+                calls.clear()
+                result = TaskMaster(runner).execute({}, diamond_top, diamond_workspace)
+                self.assertEqual(10 * 4, result.data)
+                self.assertEqual(["diamond_source"], calls)
+
+    def test_streaming(self):
+        runner = StreamingRunner()
+        self._run(runner)
+
+    def test_streaming_backpressure(self):
+        produced.clear()
+        result = TaskMaster(StreamingRunner(queue_size=4)).execute({}, stream_lead, stream_workspace)
+        self.assertLessEqual(result.data, 4 + 2)
+
+    def test_streaming_abort(self):
+        with self.assertRaises(Exception):
+            TaskMaster(StreamingRunner(queue_size=4)).execute({}, stream_abort, stream_workspace).data
+        self.assertEqual([], [t for t in threading.enumerate() if t.name.startswith("stem-stream")])
+
+    def test_streaming_bounded_pool(self):
+        expected = TaskMaster(SimpleRunner()).execute({}, float_reduce).data
+        result = TaskMaster(StreamingRunner(max_workers=2)).execute({}, float_reduce)
+        self.assertAlmostEqual(expected, result.data, places=3)
+
+    def test_shutdown_on_error(self):
+        for runner in [ThreadingRunner(), ProcessingRunner(max_workers=1)]:
+            with self.subTest(runner=runner.__class__.__name__):
+                threads = threading.active_count()
+                with self.assertRaises(Exception) as error:
+                    TaskMaster(runner).execute({}, stream_abort, stream_workspace).data
+                self.assertIsNotNone(error.exception)
+                self.assertEqual(threads, threading.active_count())
+
+    def test_process_stream(self):
+        with tempfile.TemporaryDirectory() as path:
+            started = os.path.join(path, "started")
+            meta = {"worker_source": {"started": started}}
+            result = TaskMaster(ProcessingRunner(max_workers=2, chunk_size=1)).execute(meta, worker_consumer).data
+            self.assertIsInstance(result, Iterator)
+            source_pid, consumer_started, consumer_pid = list(result)
+        self.assertNotIn(os.getpid(), [source_pid, consumer_pid])
+        self.assertEqual(1, consumer_started)
+
     def test_process(self):
         runner = ProcessingRunner()
         self._run(runner)
\ No newline at end of file
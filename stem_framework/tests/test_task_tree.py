@@ -1,8 +1,23 @@
 from unittest import TestCase
 
+from stem.meta import Meta
+from stem.task import task
+from stem.task_tree import TaskTree, TaskCycleError
+from stem.workspace import IWorkspace, LocalWorkspace
+from tests.example_task import int_range, int_scale, int_reduce, data_scale
 
-from stem.task_tree import TaskTree
-from tests.example_task import int_range, int_scale
+
+@task
+def cycle_first(meta: Meta, cycle_second: int) -> int:
+    return cycle_second
+
+
+@task
+def cycle_second(meta: Meta, cycle_first: int) -> int:
+    return cycle_first
+
+
+cycle_workspace = LocalWorkspace("cycle", {t.name: t for t in [cycle_first, cycle_second]})
 
 
 class TaskTreeTest(TestCase):
@@ -11,3 +26,23 @@ class TaskTreeTest(TestCase):
 
     def test_task_tree(self):
         self.assertEqual(self.task_node.dependencies[0].task, int_range)
+
+    def test_find_task(self):
+        tree = TaskTree(int_reduce)
+        workspace = IWorkspace.find_default_workspace(int_reduce)
+        self.assertEqual(4, len(tree))
+        self.assertIs(tree.root, tree.find_task(int_reduce))
+        node = tree.find_task(int_scale, workspace)
+        self.assertIs(tree.root.dependencies[0], node)
+        self.assertIs(node.dependencies[1], tree.find_task(data_scale))
+        self.assertIsNone(tree.find_task(int_reduce, cycle_workspace))
+
+    def test_resolve_node(self):
+        tree = TaskTree(int_scale)
+        node = tree.resolve_node(int_reduce)
+        self.assertIs(tree.root, node.dependencies[0])
+        self.assertIs(node, tree.resolve_node(int_reduce))
+
+    def test_cycle(self):
+        with self.assertRaises(TaskCycleError):
+            TaskTree(cycle_first, cycle_workspace)
@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from stem.task_master import TaskMaster
+from stem.task_runner import SimpleRunner, ThreadingRunner, AsyncRunner, ProcessingRunner, StreamingRunner
+from stem.trace import Tracer
+from tests.example_task import int_reduce, int_sum
+
+
+class TracerTest(TestCase):
+
+    def test_runners(self):
+        for runner in [SimpleRunner, ThreadingRunner, AsyncRunner, ProcessingRunner, StreamingRunner]:
+            with self.subTest(runner=runner.__name__):
+                tracer = Tracer()
+                result = TaskMaster(runner(tracer=tracer)).execute({}, int_reduce)
+                self.assertEqual(450, result.data)
+                events = {event.task: event for event in tracer.events}
+                self.assertEqual({"int_range", "data_scale", "int_scale", "int_reduce"}, set(events))
+                self.assertEqual(10, events["int_range"].items)
+                self.assertIsNone(events["int_reduce"].items)
+                self.assertTrue(all(event.wall >= 0 and event.workspace for event in tracer.events))
+
+    def test_async_task(self):
+        tracer = Tracer()
+        TaskMaster(AsyncRunner(tracer=tracer)).execute({}, int_sum).data
+        self.assertIn("int_sum", [event.task for event in tracer.events])
+
+    def test_error(self):
+        tracer = Tracer()
+        self.assertRaises(ZeroDivisionError, tracer.trace, "fail", None, lambda: 1 / 0)
+        self.assertIn("ZeroDivisionError", tracer.events[0].error)
+
+    def test_chrome(self):
+        tracer = Tracer()
+        TaskMaster(ThreadingRunner(tracer=tracer)).execute({}, int_reduce).data
+        with tempfile.TemporaryDirectory() as path:
+            tracer.save_chrome(os.path.join(path, "trace.json"))
+            with open(os.path.join(path, "trace.json")) as f:
+                trace = json.load(f)
+        self.assertEqual(4, len(trace["traceEvents"]))
+        for event in trace["traceEvents"]:
+            self.assertEqual("X", event["ph"])
+            self.assertGreaterEqual(event["ts"], 0)
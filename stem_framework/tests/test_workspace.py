@@ -1,7 +1,13 @@
+import json
+import os
+import tempfile
+from types import ModuleType
 from unittest import TestCase
+from unittest.mock import patch
 
-from stem.workspace import Workspace, IWorkspace, ProxyTask, LocalWorkspace
-from tests.example_task import int_range
+from stem.core import definition_kind
+from stem.workspace import Workspace, IWorkspace, ProxyTask, LocalWorkspace, save_manifest, load_manifest
+from tests.example_task import IntRange, int_range, int_scale, data_scale
 from tests.example_workspace import IntWorkspace, SubWorkspace, SubSubWorkspace
 
 
@@ -46,6 +52,17 @@ class WorkspaceTest(TestCase):
             with self.subTest(task):
                 self.assertTrue(IntWorkspace.has_task(task))
 
+    def test_task_path(self):
+        path = "SubWorkspace.SubSubWorkspace.sub_sub_int_range"
+        self.assertIs(SubSubWorkspace.sub_sub_int_range, IntWorkspace.find_task(path))
+        self.assertIs(SubSubWorkspace.sub_sub_int_range, IntWorkspace.find_task("SubWorkspace.sub_sub_int_range"))
+        self.assertIs(SubWorkspace.int_reduce, IntWorkspace.find_task("int_reduce"))
+        self.assertIsNone(IntWorkspace.find_task("SubSubWorkspace.sub_sub_int_range"))
+        self.assertFalse(IntWorkspace.has_task("int_range"))
+        task, workspace = IntWorkspace.resolve_task("sub_sub_int_range")
+        self.assertIs(SubSubWorkspace, workspace)
+        self.assertIs(IntWorkspace, Workspace.find_default_workspace(IntWorkspace.int_scale))
+
     def test_default_workspace(self):
 
         workspace = Workspace.find_default_workspace(int_range)
@@ -57,6 +74,66 @@ class WorkspaceTest(TestCase):
         workspace = Workspace.find_default_workspace(IntWorkspace.int_range_from_class)
         self.assertIs(workspace, self.workspace)
 
+    @patch.dict("stem.workspace._manifest")
+    def test_manifest(self):
+        def module():
+            m = ModuleType("tests.manifest_module")
+            m.int_range = int_range
+            m.int_scale = int_scale
+            m.IntWorkspace = IntWorkspace
+            m.number = 1
+            return m
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "manifest.json")
+            save_manifest(path, module())
+            load_manifest(path)
+
+        m = module()
+        m.data_scale = data_scale
+        workspace = IWorkspace.module_workspace(m)
+        self.assertListEqual(["int_range", "int_scale"], list(workspace.tasks))
+        self.assertListEqual([IntWorkspace], workspace.workspaces)
+        self.assertIs(workspace, IWorkspace.module_workspace(m))
+
+    @patch.dict("stem.workspace._manifest")
+    def test_manifest_used(self):
+        m = ModuleType("tests.resolved_module")
+        m.int_range = int_range
+        m.IntWorkspace = IntWorkspace
+        IWorkspace.module_workspace(m)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "manifest.json")
+            save_manifest(path, m)
+            with open(path) as f:
+                manifest = json.load(f)
+            self.assertDictEqual({"tasks": ["int_range"], "workspaces": ["IntWorkspace"]},
+                                 manifest["tests.resolved_module"])
+            load_manifest(path)
+
+        del m._stem_workspace
+        with patch("stem.workspace._scan", side_effect=AssertionError("module is scanned")):
+            workspace = IWorkspace.module_workspace(m)
+        self.assertListEqual(["int_range"], list(workspace.tasks))
+        self.assertListEqual([IntWorkspace], workspace.workspaces)
+
+    def test_definitions(self):
+        self.assertEqual("task", definition_kind(int_range))
+        self.assertEqual("task", definition_kind(IntRange()))
+        self.assertEqual("workspace", definition_kind(IntWorkspace))
+        self.assertEqual("workspace", definition_kind(LocalWorkspace("local", {})))
+        self.assertIsNone(definition_kind(IntRange))
+        self.assertIsNone(definition_kind(1))
+
+        m = ModuleType("tests.definitions_module")
+        m.IntRange = IntRange
+        m.int_range = int_range
+        m.int_range_instance = IntRange()
+        m.IntWorkspace = IntWorkspace
+        workspace = IWorkspace.module_workspace(m)
+        self.assertListEqual(["int_range", "int_range_instance"], list(workspace.tasks))
+        self.assertListEqual([IntWorkspace], workspace.workspaces)
+
     def test_structure(self):
         ref = {'name': 'IntWorkspace', 'tasks': ['int_range_from_class', 'int_range_from_func',
                                                  'int_range_as_method', 'data_scale', 'int_scale'],